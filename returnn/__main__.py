@@ -20,6 +20,7 @@ __email__ = "doetsch@i6.informatik.rwth-aachen.de"
 
 
 import os
+import re
 import sys
 import time
 import typing
@@ -28,7 +29,6 @@ import returnn
 from returnn.log import log
 from returnn.config import Config
 from returnn.datasets import Dataset, init_dataset, init_dataset_via_str
-from returnn.datasets.hdf import HDFDataset
 from returnn.util import debug as debug_util
 from returnn.util import basic as util
 from returnn.util.basic import BackendEngine, BehaviorVersion
@@ -148,19 +148,19 @@ def get_cache_byte_sizes():
     assert len(cache_sizes_user) == 3, "invalid amount of cache sizes specified"
     cache_sizes = []
     for cache_size_user in cache_sizes_user:
-        cache_size = cache_factor * float(cache_size_user.replace("G", "").replace("M", "").replace("K", ""))
-        assert len(cache_size_user) - len(str(cache_size)) <= 1, "invalid cache size specified"
-        if cache_size_user.find("G") > 0:
-            cache_size *= 1024 * 1024 * 1024
-        elif cache_size_user.find("M") > 0:
-            cache_size *= 1024 * 1024
-        elif cache_size_user.find("K") > 0:
-            cache_size *= 1024
+        m = _CacheSizeRegExp.match(cache_size_user)
+        assert m, "invalid cache size specified: %r" % cache_size_user
+        cache_size = cache_factor * float(m.group(1)) * _CacheSizeUnitFactors[m.group(2).upper()]
         cache_size = int(cache_size) + 1 if int(cache_size) > 0 else 0
         cache_sizes.append(cache_size)
     return cache_sizes
 
 
+# number with optional unit, e.g. "20G", "512M", "0"
+_CacheSizeRegExp = re.compile(r"^\s*([-+]?[0-9]*\.?[0-9]+)\s*([KMG]?)\s*$", re.IGNORECASE)
+_CacheSizeUnitFactors = {"": 1, "K": 1024, "M": 1024**2, "G": 1024**3}
+
+
 # noinspection PyShadowingNames
 def load_data(config, cache_byte_size, files_config_key, **kwargs):
     """
@@ -173,6 +173,8 @@ def load_data(config, cache_byte_size, files_config_key, **kwargs):
     """
     if not config.bool_or_other(files_config_key, None):
         return None, 0
+    from returnn.datasets.hdf import HDFDataset  # imported here to not pay the import cost when not needed
+
     kwargs = kwargs.copy()
     kwargs.setdefault("name", files_config_key)
     if config.is_typed(files_config_key) and isinstance(config.typed_value(files_config_key), dict):
@@ -220,15 +222,15 @@ def print_task_properties():
     """
     if train_data:
         print("Train data:", file=log.v2)
-        print("  input:", train_data.num_inputs, "x", train_data.window, file=log.v2)
-        print("  output:", train_data.num_outputs, file=log.v2)
-        print(" ", train_data.len_info() or "no info", file=log.v2)
+        print("  input: %s x %s" % (train_data.num_inputs, train_data.window), file=log.v2)
+        print("  output: %s" % (train_data.num_outputs,), file=log.v2)
+        print("  %s" % (train_data.len_info() or "no info"), file=log.v2)
     if dev_data:
         print("Dev data:", file=log.v2)
-        print(" ", dev_data.len_info() or "no info", file=log.v2)
+        print("  %s" % (dev_data.len_info() or "no info"), file=log.v2)
     if eval_data:
         print("Eval data:", file=log.v2)
-        print(" ", eval_data.len_info() or "no info", file=log.v2)
+        print("  %s" % (eval_data.len_info() or "no info"), file=log.v2)
 
 
 def init_engine():
@@ -294,6 +296,13 @@ def init_backend_engine():
 
     BackendEngine.select_engine(config=config)
     if BackendEngine.is_tensorflow_selected():
+        if config.value("TF_CUDNN_USE_AUTOTUNE", None) is not None:
+            # With autotuning, cuDNN benchmarks the conv algorithms,
+            # and e.g. picks Winograd for 3x3 stride-1 convs when it is faster.
+            # TF reads this when the first conv is executed, so it is early enough to set it here.
+            value = "1" if config.bool("TF_CUDNN_USE_AUTOTUNE", True) else "0"
+            print(f"Set TF_CUDNN_USE_AUTOTUNE={value}.", file=log.v4)
+            os.environ["TF_CUDNN_USE_AUTOTUNE"] = value
         print("TensorFlow:", util.describe_tensorflow_version(), file=log.v3)
         if util.get_tensorflow_version_tuple()[0] == 0:
             print("Warning: TF <1.0 is not supported and likely broken.", file=log.v2)
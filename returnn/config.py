@@ -98,11 +98,14 @@ class Config:
         :param string|io.TextIOBase|io.StringIO f:
         """
         if isinstance(f, str):
-            assert os.path.isfile(f), "config file not found: %r" % f
+            try:
+                with open(f) as config_file:
+                    content = config_file.read()
+            except (FileNotFoundError, IsADirectoryError, NotADirectoryError):
+                raise AssertionError("config file not found: %r" % f) from None
             self.files.append(f)
             filename = f
             dirname = os.path.dirname(filename) or "."
-            content = open(filename).read()
         else:
             # assume stream-like
             filename = "<config string>"
@@ -174,94 +177,7 @@ class Config:
         """
         :param list[str]|tuple[str] args:
         """
-        from optparse import OptionParser
-
-        parser = OptionParser()
-        parser.add_option(
-            "-a",
-            "--activation",
-            dest="activation",
-            help="[STRING/LIST] Activation functions: logistic, tanh, softsign, relu, identity, zero, one, maxout.",
-        )
-        parser.add_option(
-            "-b",
-            "--batch_size",
-            dest="batch_size",
-            help="[INTEGER/TUPLE] Maximal number of frames per batch (optional: shift of batching window).",
-        )
-        parser.add_option(
-            "-c",
-            "--chunking",
-            dest="chunking",
-            help="[INTEGER/TUPLE] Maximal number of frames per sequence (optional: shift of chunking window).",
-        )
-        parser.add_option("-d", "--description", dest="description", help="[STRING] Description of experiment.")
-        parser.add_option("-e", "--epoch", dest="epoch", help="[INTEGER] Starting epoch.")
-        parser.add_option("-E", "--eval", dest="eval", help="[STRING] eval file path")
-        parser.add_option(
-            "-f",
-            "--gate_factors",
-            dest="gate_factors",
-            help="[none/local/global] Enables pooled (local) or separate (global) coefficients on gates.",
-        )
-        parser.add_option("-g", "--lreg", dest="lreg", help="[FLOAT] L1 or L2 regularization.")
-        parser.add_option(
-            "-i",
-            "--save_interval",
-            dest="save_interval",
-            help="[INTEGER] Number of epochs until a new model will be saved.",
-        )
-        parser.add_option("-j", "--dropout", dest="dropout", help="[FLOAT] Dropout probability (0 to disable).")
-        parser.add_option(
-            "-k", "--output_file", dest="output_file", help="[STRING] Path to target file for network output."
-        )
-        parser.add_option("-l", "--log", dest="log", help="[STRING] Log file path.")
-        parser.add_option("-L", "--load", dest="load", help="[STRING] load model file path.")
-        parser.add_option(
-            "-m", "--momentum", dest="momentum", help="[FLOAT] Momentum term in gradient descent optimization."
-        )
-        parser.add_option(
-            "-n", "--num_epochs", dest="num_epochs", help="[INTEGER] Number of epochs that should be trained."
-        )
-        parser.add_option("-o", "--order", dest="order", help="[default/sorted/random] Ordering of sequences.")
-        parser.add_option("-p", "--loss", dest="loss", help="[loglik/sse/ctc] Objective function to be optimized.")
-        parser.add_option(
-            "-q",
-            "--cache",
-            dest="cache",
-            help="[INTEGER] Cache size in bytes (supports notation for kilo (K), mega (M) and gigabyte (G)).",
-        )
-        parser.add_option(
-            "-r",
-            "--learning_rate",
-            dest="learning_rate",
-            help="[FLOAT] Learning rate in gradient descent optimization.",
-        )
-        parser.add_option(
-            "-s", "--hidden_sizes", dest="hidden_sizes", help="[INTEGER/LIST] Number of units in hidden layers."
-        )
-        parser.add_option(
-            "-t",
-            "--truncate",
-            dest="truncate",
-            help="[INTEGER] Truncates sequence in BPTT routine after specified number of timesteps (-1 to disable).",
-        )
-        parser.add_option(
-            "-u",
-            "--device",
-            dest="device",
-            help="[STRING/LIST] CPU and GPU devices that should be used (example: gpu0,cpu[1-6] or gpu,cpu*).",
-        )
-        parser.add_option("-v", "--verbose", dest="log_verbosity", help="[INTEGER] Verbosity level from 0 - 5.")
-        parser.add_option("-w", "--window", dest="window", help="[INTEGER] Width of sliding window over sequence.")
-        parser.add_option("-x", "--task", dest="task", help="[train/forward/analyze] Task of the current program call.")
-        parser.add_option(
-            "-y", "--hidden_type", dest="hidden_type", help="[VALUE/LIST] Hidden layer types: forward, recurrent, lstm."
-        )
-        parser.add_option(
-            "-z", "--max_sequences", dest="max_seqs", help="[INTEGER] Maximal number of sequences per batch."
-        )
-        parser.add_option("--config", dest="load_config", help="[STRING] load config")
+        parser = _get_cmd_args_parser()
         (options, args) = parser.parse_args(list(args))
         options = vars(options)
         for opt in options.keys():
@@ -617,6 +533,108 @@ class Config:
             return int(value), int(value)
 
 
+_cmd_args_parser = None  # type: typing.Optional[optparse.OptionParser]
+
+
+def _get_cmd_args_parser():
+    """
+    :return: parser for :func:`Config.parse_cmd_args`.
+      We create it only once. parse_args does not modify the parser, so it can be reused.
+    :rtype: optparse.OptionParser
+    """
+    global _cmd_args_parser
+    if _cmd_args_parser is not None:
+        return _cmd_args_parser
+    from optparse import OptionParser
+
+    parser = OptionParser()
+    parser.add_option(
+        "-a",
+        "--activation",
+        dest="activation",
+        help="[STRING/LIST] Activation functions: logistic, tanh, softsign, relu, identity, zero, one, maxout.",
+    )
+    parser.add_option(
+        "-b",
+        "--batch_size",
+        dest="batch_size",
+        help="[INTEGER/TUPLE] Maximal number of frames per batch (optional: shift of batching window).",
+    )
+    parser.add_option(
+        "-c",
+        "--chunking",
+        dest="chunking",
+        help="[INTEGER/TUPLE] Maximal number of frames per sequence (optional: shift of chunking window).",
+    )
+    parser.add_option("-d", "--description", dest="description", help="[STRING] Description of experiment.")
+    parser.add_option("-e", "--epoch", dest="epoch", help="[INTEGER] Starting epoch.")
+    parser.add_option("-E", "--eval", dest="eval", help="[STRING] eval file path")
+    parser.add_option(
+        "-f",
+        "--gate_factors",
+        dest="gate_factors",
+        help="[none/local/global] Enables pooled (local) or separate (global) coefficients on gates.",
+    )
+    parser.add_option("-g", "--lreg", dest="lreg", help="[FLOAT] L1 or L2 regularization.")
+    parser.add_option(
+        "-i",
+        "--save_interval",
+        dest="save_interval",
+        help="[INTEGER] Number of epochs until a new model will be saved.",
+    )
+    parser.add_option("-j", "--dropout", dest="dropout", help="[FLOAT] Dropout probability (0 to disable).")
+    parser.add_option(
+        "-k", "--output_file", dest="output_file", help="[STRING] Path to target file for network output."
+    )
+    parser.add_option("-l", "--log", dest="log", help="[STRING] Log file path.")
+    parser.add_option("-L", "--load", dest="load", help="[STRING] load model file path.")
+    parser.add_option(
+        "-m", "--momentum", dest="momentum", help="[FLOAT] Momentum term in gradient descent optimization."
+    )
+    parser.add_option(
+        "-n", "--num_epochs", dest="num_epochs", help="[INTEGER] Number of epochs that should be trained."
+    )
+    parser.add_option("-o", "--order", dest="order", help="[default/sorted/random] Ordering of sequences.")
+    parser.add_option("-p", "--loss", dest="loss", help="[loglik/sse/ctc] Objective function to be optimized.")
+    parser.add_option(
+        "-q",
+        "--cache",
+        dest="cache",
+        help="[INTEGER] Cache size in bytes (supports notation for kilo (K), mega (M) and gigabyte (G)).",
+    )
+    parser.add_option(
+        "-r",
+        "--learning_rate",
+        dest="learning_rate",
+        help="[FLOAT] Learning rate in gradient descent optimization.",
+    )
+    parser.add_option(
+        "-s", "--hidden_sizes", dest="hidden_sizes", help="[INTEGER/LIST] Number of units in hidden layers."
+    )
+    parser.add_option(
+        "-t",
+        "--truncate",
+        dest="truncate",
+        help="[INTEGER] Truncates sequence in BPTT routine after specified number of timesteps (-1 to disable).",
+    )
+    parser.add_option(
+        "-u",
+        "--device",
+        dest="device",
+        help="[STRING/LIST] CPU and GPU devices that should be used (example: gpu0,cpu[1-6] or gpu,cpu*).",
+    )
+    parser.add_option("-v", "--verbose", dest="log_verbosity", help="[INTEGER] Verbosity level from 0 - 5.")
+    parser.add_option("-w", "--window", dest="window", help="[INTEGER] Width of sliding window over sequence.")
+    parser.add_option("-x", "--task", dest="task", help="[train/forward/analyze] Task of the current program call.")
+    parser.add_option(
+        "-y", "--hidden_type", dest="hidden_type", help="[VALUE/LIST] Hidden layer types: forward, recurrent, lstm."
+    )
+    parser.add_option("-z", "--max_sequences", dest="max_seqs", help="[INTEGER] Maximal number of sequences per batch.")
+    parser.add_option("--config", dest="load_config", help="[STRING] load config")
+    _cmd_args_parser = parser
+    return parser
+
+
 _global_config = None  # type: typing.Optional[Config]
 
 
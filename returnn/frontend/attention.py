@@ -188,6 +188,19 @@ class CausalSelfAttention(SelfAttentionBase):
     Classic causal self attention
     """
 
+    def __init__(self, *args, kv_cache_dtype: Optional[str] = None, **kwargs):
+        """
+        :param kv_cache_dtype: if set (only "int8" supported currently),
+            the accumulated keys and values in the state (KV cache) are stored quantized in this dtype,
+            with a scale per frame and head.
+            This reduces the memory of the state for step-wise decoding, at the cost of some precision.
+            By default, they are stored as they are.
+        """
+        super().__init__(*args, **kwargs)
+        if kv_cache_dtype not in (None, "int8"):
+            raise ValueError(f"{self}: kv_cache_dtype {kv_cache_dtype!r} not supported")
+        self.kv_cache_dtype = kv_cache_dtype
+
     def __call__(
         self,
         source: Tensor,
@@ -197,7 +210,9 @@ class CausalSelfAttention(SelfAttentionBase):
     ) -> Tuple[Tensor, CausalSelfAttentionState]:
         """forward"""
         q, k, v = self.forward_qkv(source)
-        k, v, hist_dim, new_state = _causal_self_att_step(k, v, axis=axis, state=state, self=self)
+        k, v, hist_dim, new_state = _causal_self_att_step(
+            k, v, axis=axis, state=state, self=self, kv_cache_dtype=self.kv_cache_dtype
+        )
         output = self.attention(q, k, v, kv_axis=hist_dim)
         return output, new_state
 
@@ -211,6 +226,19 @@ class CausalSelfAttention(SelfAttentionBase):
         # We just keep this code in place to be prepared for that.
         # The reason it works right now is that we do an optimization where we replace zero init state by 0.
         expand_dim = Dim(0, name="self_att_expand_dim_init")
+        if self.kv_cache_dtype:
+            state = CausalSelfAttentionState(
+                k_accum=rf.zeros(
+                    list(batch_dims) + [expand_dim, self.num_heads, self.key_dim_per_head], dtype=self.kv_cache_dtype
+                ),
+                v_accum=rf.zeros(
+                    list(batch_dims) + [expand_dim, self.num_heads, self.value_dim_per_head], dtype=self.kv_cache_dtype
+                ),
+                accum_axis=expand_dim,
+            )
+            state.k_scale_accum = rf.zeros(list(batch_dims) + [expand_dim, self.num_heads])
+            state.v_scale_accum = rf.zeros(list(batch_dims) + [expand_dim, self.num_heads])
+            return state
         return CausalSelfAttentionState(
             k_accum=rf.zeros(list(batch_dims) + [expand_dim, self.num_heads, self.key_dim_per_head]),
             v_accum=rf.zeros(list(batch_dims) + [expand_dim, self.num_heads, self.value_dim_per_head]),
@@ -225,7 +253,30 @@ def _causal_self_att_step(
     axis: Dim,
     state: Optional[CausalSelfAttentionState],
     self: rf.Module,
+    kv_cache_dtype: Optional[str] = None,
 ) -> Tuple[Tensor, Tensor, Dim, CausalSelfAttentionState]:
+    if axis == single_step_dim and kv_cache_dtype:
+        assert state, f"{self}: need state for single step"
+        k_dim, v_dim = self.key_dim_per_head, self.value_dim_per_head
+        k_q, k_scale = _quantize_per_frame(k, axis=k_dim, dtype=kv_cache_dtype)
+        v_q, v_scale = _quantize_per_frame(v, axis=v_dim, dtype=kv_cache_dtype)
+        k_q, hist_dim = rf.cum_concat_step(k_q, prev_accum=state.k_accum, axis=state.accum_axis)
+        v_q, _ = rf.cum_concat_step(v_q, prev_accum=state.v_accum, out_spatial_dim=hist_dim, axis=state.accum_axis)
+        k_scale, _ = rf.cum_concat_step(
+            k_scale, prev_accum=state.k_scale_accum, out_spatial_dim=hist_dim, axis=state.accum_axis
+        )
+        v_scale, _ = rf.cum_concat_step(
+            v_scale, prev_accum=state.v_scale_accum, out_spatial_dim=hist_dim, axis=state.accum_axis
+        )
+        new_state = CausalSelfAttentionState()
+        new_state.k_accum = k_q
+        new_state.v_accum = v_q
+        new_state.accum_axis = hist_dim
+        new_state.k_scale_accum = k_scale
+        new_state.v_scale_accum = v_scale
+        k = rf.cast(k_q, k.dtype) * k_scale
+        v = rf.cast(v_q, v.dtype) * v_scale
+        return k, v, hist_dim, new_state
     if axis == single_step_dim:
         assert state, f"{self}: need state for single step"
         k, hist_dim = rf.cum_concat_step(k, prev_accum=state.k_accum, axis=state.accum_axis)
@@ -243,9 +294,31 @@ def _causal_self_att_step(
     new_state.k_accum = k
     new_state.v_accum = v
     new_state.accum_axis = hist_dim
+    if kv_cache_dtype:  # keep the state in the same format as for the single step
+        new_state.k_accum, new_state.k_scale_accum = _quantize_per_frame(
+            k, axis=self.key_dim_per_head, dtype=kv_cache_dtype
+        )
+        new_state.v_accum, new_state.v_scale_accum = _quantize_per_frame(
+            v, axis=self.value_dim_per_head, dtype=kv_cache_dtype
+        )
     return k, v, hist_dim, new_state
 
 
+def _quantize_per_frame(x: Tensor, *, axis: Dim, dtype: str) -> Tuple[Tensor, Tensor]:
+    """
+    Symmetric quantization, with one scale for all values over ``axis``.
+
+    :param x: [..., axis]
+    :param axis: e.g. the key dim per head
+    :param dtype: currently only "int8"
+    :return: x quantized [..., axis] in dtype, scale [...], such that x ~= cast(x_q, x.dtype) * scale
+    """
+    assert dtype == "int8"
+    scale = rf.maximum(rf.reduce_max(rf.abs(x), axis=axis), 1e-8) * (1.0 / 127.0)
+    x_q = rf.cast(rf.clip_by_value(rf.round(x / scale), -127.0, 127.0), dtype)
+    return x_q, scale
+
+
 class CausalSelfAttentionState(rf.State):
     """
     State for :class:`StepwiseCausalSelfAttention`.
@@ -502,7 +575,9 @@ class RelPosCausalSelfAttention(CausalSelfAttention):
     ) -> Tuple[Tensor, CausalSelfAttentionState]:
         """forward"""
         q, k, v = self.forward_qkv(source)
-        k, v, hist_dim, new_state = _causal_self_att_step(k, v, axis=axis, state=state, self=self)
+        k, v, hist_dim, new_state = _causal_self_att_step(
+            k, v, axis=axis, state=state, self=self, kv_cache_dtype=self.kv_cache_dtype
+        )
 
         if self.learned_pos_emb is not None:
             pos_emb, pos_emb_spatial_dim = self.learned_pos_emb(query_spatial_dim=axis, key_value_spatial_dim=hist_dim)
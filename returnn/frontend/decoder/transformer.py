@@ -14,9 +14,11 @@ References:
 from __future__ import annotations
 from typing import Optional, Any, Union, Tuple, Dict, Callable, Sequence
 import functools
+import weakref
 import copy as _copy
 from returnn.util.basic import NotSpecified
 import returnn.frontend as rf
+from returnn.frontend._backend import get_backend_by_tensor, global_backend
 from returnn.tensor import Tensor, Dim, single_step_dim
 
 
@@ -82,14 +84,11 @@ class TransformerDecoder(rf.Module):
             )
             if decoder_layer_opts:
                 decoder_layer_opts_.update(decoder_layer_opts)
-            if not decoder_layer:
-                decoder_layer = TransformerDecoderLayer(**decoder_layer_opts_)
-            elif isinstance(decoder_layer, type):
-                decoder_layer = decoder_layer(**decoder_layer_opts_)
-            else:
-                raise TypeError(f"unexpected decoder_layer {decoder_layer!r}")
-
-        self.layers = rf.Sequential(_copy.deepcopy(decoder_layer) for _ in range(num_layers))
+            decoder_layer_cls = decoder_layer or TransformerDecoderLayer
+            # Directly create a new instance per layer. No need to deepcopy some prototype instance.
+            self.layers = rf.Sequential(decoder_layer_cls(**decoder_layer_opts_) for _ in range(num_layers))
+        else:
+            self.layers = rf.Sequential(_copy.deepcopy(decoder_layer) for _ in range(num_layers))
 
         self.final_layer_norm = rf.LayerNorm(model_dim)
 
@@ -133,7 +132,16 @@ class TransformerDecoder(rf.Module):
         new_state = rf.State()
 
         decoded = self.input_embedding(source)
-        decoded = decoded + self.pos_enc(spatial_dim=spatial_dim, offset=state.pos)
+        if (
+            spatial_dim == single_step_dim
+            and state.pos.dims == ()
+            and get_backend_by_tensor(state.pos, fallback=global_backend).executing_eagerly()
+        ):
+            decoded = decoded + _pos_enc_single_step(
+                state.pos, feat_dim=self.model_dim, dtype=self.input_embedding.weight.dtype, device=decoded.device
+            )
+        else:
+            decoded = decoded + self.pos_enc(spatial_dim=spatial_dim, offset=state.pos)
 
         new_state.pos = state.pos + (1 if spatial_dim == single_step_dim else spatial_dim.get_size_tensor())
 
@@ -151,6 +159,36 @@ class TransformerDecoder(rf.Module):
         return logits, new_state
 
 
+_pos_enc_single_step_cache = weakref.WeakKeyDictionary()  # run ctx -> (feat_dim, dtype, device) -> (dim, enc)
+
+
+def _pos_enc_single_step(pos: Tensor, *, feat_dim: Dim, dtype: str, device: Optional[str]) -> Tensor:
+    """
+    Positional encoding for a single decoder step.
+    In eager mode, ``pos`` is a new tensor in every step,
+    so the cache of :func:`rf.sinusoidal_positional_encoding` (keyed by the offset) would not be hit.
+    Thus we keep a table of the encodings for the first positions, and extend it when needed,
+    such that we do not recompute the sin/cos in every step.
+    This needs eager mode, where we know the value of ``pos``.
+
+    :param pos: scalar, current position
+    :param feat_dim:
+    :param dtype:
+    :param device:
+    :return: [feat_dim]
+    """
+    pos_ = int(pos.raw_tensor)
+    cache = _pos_enc_single_step_cache.setdefault(rf.get_run_ctx(), {})
+    cache_key = (feat_dim, dtype, device)
+    table_dim, table = cache.get(cache_key, (None, None))
+    if table_dim is None or table_dim.dimension <= pos_:
+        old_size = table_dim.dimension if table_dim is not None else 0
+        table_dim = Dim(max(pos_ + 1, 2 * old_size, 1024), name="transformer-dec-pos-enc")
+        table = rf.sinusoidal_positional_encoding(spatial_dim=table_dim, feat_dim=feat_dim, dtype=dtype, device=device)
+        cache[cache_key] = (table_dim, table)
+    return rf.gather(table, indices=pos_, axis=table_dim)
+
+
 class TransformerDecoderLayer(rf.Module):
     """
     Represents a conformer block
@@ -186,6 +224,7 @@ class TransformerDecoderLayer(rf.Module):
         self.dropout = dropout
         self.dropout_broadcast = rf.dropout_broadcast_default()
         self.out_dim = out_dim
+        self._dropout_axis = self.dropout_broadcast and self.out_dim
 
         if ff_dim is None:
             ff_dim = 4 * out_dim
@@ -236,19 +275,19 @@ class TransformerDecoderLayer(rf.Module):
         new_state = rf.State()
         x_sa_ln = self.self_att_layer_norm(inp)
         x_sa, new_state.self_att = self.self_att(x_sa_ln, axis=spatial_dim, state=state.self_att)
-        x_sa = rf.dropout(x_sa, self.dropout, axis=self.dropout_broadcast and self.out_dim)
+        x_sa = rf.dropout(x_sa, self.dropout, axis=self._dropout_axis)
         x_sa_out = x_sa + inp
 
         # (multi-head) cross-attention (CA)
         x_ca_ln = self.cross_att_layer_norm(x_sa_out)
         x_ca = self.cross_att(x_ca_ln, encoder.cross_att)
-        x_ca = rf.dropout(x_ca, self.dropout, axis=self.dropout_broadcast and self.out_dim)
+        x_ca = rf.dropout(x_ca, self.dropout, axis=self._dropout_axis)
         x_ca_out = x_ca + x_sa_out
 
         # feed-forward (FF)
         x_ff_ln = self.ff_layer_norm(x_ca_out)
         x_ff = self.ff(x_ff_ln)
-        x_ff = rf.dropout(x_ff, self.dropout, axis=self.dropout_broadcast and self.out_dim)
+        x_ff = rf.dropout(x_ff, self.dropout, axis=self._dropout_axis)
         x_ff_out = x_ff + x_ca_out
 
         return x_ff_out, new_state
@@ -286,11 +325,12 @@ class FeedForward(rf.Module):
 
         self.linear_ff = rf.Linear(out_dim, ff_dim)
         self.linear_out = rf.Linear(ff_dim, out_dim)
+        self._dropout_axis = self.dropout_broadcast and self.linear_ff.out_dim
 
     def __call__(self, inp: Tensor) -> Tensor:
         """forward"""
         x_ff1 = self.linear_ff(inp)
         x_act = self.activation(x_ff1)
-        x_drop = rf.dropout(x_act, self.dropout, axis=self.dropout_broadcast and self.linear_ff.out_dim)
+        x_drop = rf.dropout(x_act, self.dropout, axis=self._dropout_axis)
         x_ff2 = self.linear_out(x_drop)
         return x_ff2
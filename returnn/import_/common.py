@@ -78,6 +78,10 @@ def _setup_pkg_import():
         sys.path.insert(0, _package_import_path())
 
 
+# Dirs which were already checked or created by _mk_py_pkg_dirs, to avoid redundant file system access.
+_py_pkg_dirs_ready = set()  # type: typing.Set[str]
+
+
 def _mk_py_pkg_dirs(start_path, end_path=None):
     """
     :param str start_path:
@@ -92,8 +96,11 @@ def _mk_py_pkg_dirs(start_path, end_path=None):
         end_path = start_path
     path = start_path
     while True:
-        if os.path.exists(path):
+        if path in _py_pkg_dirs_ready:
+            pass
+        elif os.path.exists(path):
             assert os.path.isdir(path) and not os.path.islink(path) and os.path.exists(path + "/__init__.py")
+            _py_pkg_dirs_ready.add(path)
         else:
             os.mkdir(path)
             with open(path + "/__init__.py", "x") as f:
@@ -101,6 +108,7 @@ def _mk_py_pkg_dirs(start_path, end_path=None):
                 f.write("from returnn.import_.common import setup_py_pkg\n")
                 f.write("setup_py_pkg(globals())\n")
                 f.close()
+            _py_pkg_dirs_ready.add(path)
         if len(path) == len(end_path):
             break
         p = end_path.find("/", len(path) + 1)
@@ -156,6 +164,12 @@ def _register_module(mod_name, info):
         _registered_modules[mod_name[:p]] = info
 
 
+# (repo_path, path) -> (rel_pkg_path0, rel_pkg_dir), see module_name.
+_rel_pkg_paths_cache = {}  # type: typing.Dict[typing.Tuple[str,str],typing.Tuple[str,str]]
+# Symlinks (file -> target) which were already checked or created by module_name.
+_symlinks_ready = {}  # type: typing.Dict[str,str]
+
+
 def module_name(repo, repo_path, path, version, make_ready=True):
     """
     :param str repo: e.g. "github.com/rwth-i6/returnn-experiments"
@@ -184,12 +198,15 @@ def module_name(repo, repo_path, path, version, make_ready=True):
             path = path[2:]
         else:
             raise ValueError("invalid path %r" % path)
-    full_path = "%s/%s" % (repo_path, path)
-    if os.path.exists("%s/__init__.py" % repo_path):  # is the repo itself a package?
+    if (repo_path, path) in _rel_pkg_paths_cache:
+        rel_pkg_path0, rel_pkg_dir = _rel_pkg_paths_cache[(repo_path, path)]
+    elif os.path.exists("%s/__init__.py" % repo_path):  # is the repo itself a package?
         # This needs somewhat special handling.
         rel_pkg_path0 = ""
         rel_pkg_dir = ""
+        _rel_pkg_paths_cache[(repo_path, path)] = (rel_pkg_path0, rel_pkg_dir)
     else:
+        full_path = "%s/%s" % (repo_path, path)
         py_pkg_dirname = _find_root_python_package(full_path)
         assert len(py_pkg_dirname) >= len(repo_path)
         rel_pkg_path = full_path[len(py_pkg_dirname) + 1 :]
@@ -199,6 +216,7 @@ def module_name(repo, repo_path, path, version, make_ready=True):
         else:
             rel_pkg_path0 = rel_pkg_path
         rel_pkg_dir = py_pkg_dirname[len(repo_path) :]  # starting with "/" or empty
+        _rel_pkg_paths_cache[(repo_path, path)] = (rel_pkg_path0, rel_pkg_dir)
 
     repo_dir_name = os.path.dirname(repo)
     repo_path_basename = os.path.basename(repo_path)
@@ -219,11 +237,17 @@ def module_name(repo, repo_path, path, version, make_ready=True):
         symlink_target = "%s%s/%s" % (repo_path, rel_pkg_dir, rel_pkg_path0)
         symlink_file = symlink_file.rstrip("/")
         symlink_target = symlink_target.rstrip("/")
-        if os.path.exists(symlink_file):
-            assert os.readlink(symlink_file) == symlink_target
+        if symlink_file in _symlinks_ready:
+            assert _symlinks_ready[symlink_file] == symlink_target
         else:
-            logger.debug("Symlink %s -> %s", symlink_file, symlink_target)
-            os.symlink(symlink_target, symlink_file, target_is_directory=os.path.isdir(symlink_target))
+            try:
+                existing_symlink_target = os.readlink(symlink_file)
+            except FileNotFoundError:
+                logger.debug("Symlink %s -> %s", symlink_file, symlink_target)
+                os.symlink(symlink_target, symlink_file, target_is_directory=os.path.isdir(symlink_target))
+            else:
+                assert existing_symlink_target == symlink_target
+            _symlinks_ready[symlink_file] = symlink_target
 
         _register_module(
             mod_name=ModuleNamePrefix + _normalize_pkg_name(repo_v + rel_pkg_dir).replace("/", "."),
@@ -236,17 +260,31 @@ def module_name(repo, repo_path, path, version, make_ready=True):
     return ModuleNamePrefix + name
 
 
+# dir -> root Python package dir, see _find_root_python_package.
+_root_python_package_cache = {}  # type: typing.Dict[str,str]
+
+
 def _find_root_python_package(full_path):
     """
     :param str full_path: some Python file
     :return: going up from path, and first dir which does not include __init__.py
     :rtype: str
     """
+    visited_dirs = []
     p = len(full_path)
     while True:
         p = full_path.rfind("/", 0, p)
         assert p > 0
         d = full_path[:p]
+        if d in _root_python_package_cache:
+            res = _root_python_package_cache[d]
+            break
         assert os.path.isdir(d)
+        visited_dirs.append(d)
         if not os.path.exists(d + "/__init__.py"):
-            return d
+            res = d
+            break
+    # All the visited dirs share the same root package dir.
+    for d in visited_dirs:
+        _root_python_package_cache[d] = res
+    return res
@@ -6,6 +6,7 @@ or just rarely used attribs, such that we can save memory for the common case.
 from __future__ import annotations
 from typing import TYPE_CHECKING, Optional, Union, Type, Sequence, Tuple, List, Dict, Set
 import os
+import re
 
 if TYPE_CHECKING:
     # Those are only used for TensorFlow, or they are deprecated.
@@ -25,6 +26,14 @@ import returnn.tensor.marked_dim as _m
 from ._tensor_mixin_base import _TensorMixinBase
 
 
+# For get_axes_from_description, which is called often during network construction.
+_axis_desc_spatial_idx_re = re.compile("(s|spatial):-?\\d+$")
+_axis_desc_dyn_idx_re = re.compile("(d|dyn|dynamic):-?\\d+$")
+_axis_desc_except_batch_idx_re = re.compile("(except_batch):-?\\d+$")
+_axis_desc_static_idx_re = re.compile("(static):-?\\d+$")
+_axis_desc_dim_re = re.compile("(dim):\\d+$")
+
+
 class _TensorExtra:
     def __init__(
         self,
@@ -2365,15 +2374,13 @@ class _TensorMixin(_TensorMixinBase):
             return [self._make_valid_int_axis(axes)]
         assert isinstance(axes, (str, int, list, tuple, Sequence))
         if isinstance(axes, str):
-            import re
-
             axes = axes.lower()
             if axes in ["b", "batch"]:
                 assert self.batch_dim_axis is not None
                 return [self.batch_dim_axis]
             elif axes == "spatial":
                 return self.get_spatial_batch_axes()
-            elif re.match("(s|spatial):-?\\d+$", axes):
+            elif _axis_desc_spatial_idx_re.match(axes):
                 self._verify_axis_order_dependent()
                 s = int(axes.split(":")[1])
                 spatial_axes = self.get_spatial_batch_axes()
@@ -2383,7 +2390,7 @@ class _TensorMixin(_TensorMixinBase):
                 return [spatial_axes[s]]
             elif axes in ["dyn", "dynamic"]:
                 return self.get_dynamic_axes()
-            elif re.match("(d|dyn|dynamic):-?\\d+$", axes):
+            elif _axis_desc_dyn_idx_re.match(axes):
                 self._verify_axis_order_dependent()
                 s = int(axes.split(":")[1])
                 dyn_axes = self.get_dynamic_axes()
@@ -2411,7 +2418,7 @@ class _TensorMixin(_TensorMixinBase):
                 axes = list(range(self.batch_ndim))
                 axes.remove(self.batch_dim_axis)
                 return axes
-            elif re.match("(except_batch):-?\\d+$", axes):
+            elif _axis_desc_except_batch_idx_re.match(axes):
                 self._verify_axis_order_dependent()
                 s = int(axes.split(":")[1])
                 non_batch_axes = list(range(self.batch_ndim))
@@ -2425,7 +2432,7 @@ class _TensorMixin(_TensorMixinBase):
                 return list(range(self.batch_ndim))
             elif axes == "static":
                 return self.get_static_axes()
-            elif re.match("(static):-?\\d+$", axes):
+            elif _axis_desc_static_idx_re.match(axes):
                 self._verify_axis_order_dependent()
                 s = int(axes.split(":")[1])
                 static_axes = self.get_static_axes()
@@ -2433,7 +2440,7 @@ class _TensorMixin(_TensorMixinBase):
                     s += len(static_axes)
                 assert 0 <= s < len(static_axes), "%s get_axes_from_description: %r invalid" % (self, axes)
                 return [static_axes[s]]
-            elif re.match("(dim):\\d+$", axes):
+            elif _axis_desc_dim_re.match(axes):
                 s = int(axes.split(":")[1])
                 dims = [a for a in range(self.batch_ndim) if self.batch_shape[a] == s]
                 assert dims, "%s get_axes_from_description: 'dim:%i' not found" % (self, s)
@@ -224,6 +224,7 @@ class LayerBase(object):
         if copy_output_loss_from_source_idx is not None:
             self.output_loss = sources[copy_output_loss_from_source_idx].output_loss
         self.rec_vars_outputs = {}  # type: typing.Dict[str,tf.Tensor]
+        self._last_hidden_state_cache = {}  # type: typing.Dict[typing.Union[int,str,None],tf.Tensor]
         self.search_choices = None  # type: typing.Optional[SearchChoices]
         self._src_common_search_choices = _src_common_search_choices
         self._initial_output = initial_output
@@ -247,6 +248,7 @@ class LayerBase(object):
         )  # type:  typing.Dict[tf.Variable,typing.Union['tensorflow.python.training.saver.BaseSaverBuilder.SaveableObject',None]]  # see get_saveable_params_dict()  # nopep8
         self.reuse_params = reuse_params
         self.name_scope = name_scope
+        self._tf_scope_name = self._get_tf_scope_name()
         self.param_device = param_device
         self.L2 = L2
         self.darc1 = darc1
@@ -324,7 +326,10 @@ class LayerBase(object):
                 opts = {}
                 if isinstance(self.use_batch_norm, dict):
                     opts = self.use_batch_norm
-                self.output.placeholder = self.batch_norm(self.output, **opts)
+                # Also in the XLA JIT scope (if enabled) of the layer itself,
+                # such that the normalization can be fused with the ops of the layer.
+                with self.xla_jit_scope():
+                    self.output.placeholder = self.batch_norm(self.output, **opts)
             if self.control_dependencies_on_output:
                 control_deps = self.control_dependencies_on_output(self)
                 if not isinstance(control_deps, (list, tuple)):
@@ -732,7 +737,6 @@ class LayerBase(object):
         Usually the only reason to overwrite this is when some argument might be a reference to a layer
         which should be resolved.
         """
-        from .basic import get_loss_class
         from ..network import LayerNotFound
 
         BehaviorVersion.require(
@@ -752,6 +756,8 @@ class LayerBase(object):
         if "reuse_params" in d:
             d["reuse_params"] = ReuseParams.from_config_dict(d["reuse_params"], network=network, get_layer=get_layer)
         if d.get("loss", None) and "target" not in d:
+            from .basic import get_loss_class
+
             target = get_loss_class(d["loss"]).get_default_target(network.extern_data)
             if target:
                 d["target"] = target
@@ -879,8 +885,6 @@ class LayerBase(object):
         :return: out_dim value
         :rtype: returnn.tensor.Dim|None
         """
-        from .basic import get_loss_class
-
         if target in target_layers:
             target_data = target_layers[target].output
         else:
@@ -898,6 +902,8 @@ class LayerBase(object):
         if not out_dim:
             return None
         if loss_class_name:
+            from .basic import get_loss_class
+
             out_dim = get_loss_class(loss_class_name).get_auto_output_layer_dim(out_dim)
         return out_dim
 
@@ -972,18 +978,25 @@ class LayerBase(object):
         with reuse_name_scope(scope, absolute=name_scope_abs):
             yield
 
-    @property
-    def tf_scope_name(self):
+    def _get_tf_scope_name(self):
         """
         :rtype: str
-        :return: normally just self.name, but make it a valid TF scope name.
-          this is meant mostly to extend TF names. see func:`get_base_absolute_name_scope_prefix` otherwise.
         """
         if self.name_scope and not self.name_scope.startswith("/"):
             assert not self.name_scope.endswith("/")
             return self.name_scope
         return self.cls_get_tf_scope_name(name=self.name)
 
+    @property
+    def tf_scope_name(self):
+        """
+        :rtype: str
+        :return: normally just self.name, but make it a valid TF scope name.
+          this is meant mostly to extend TF names. see func:`get_base_absolute_name_scope_prefix` otherwise.
+          This is computed once in :func:`__init__`, as this is accessed often during graph construction.
+        """
+        return self._tf_scope_name
+
     def get_base_absolute_name_scope_prefix(self):
         """
         :return: e.g. "output/", always with "/" at end, or "". this is for the TF name scope or variable scope
@@ -1190,6 +1203,19 @@ class LayerBase(object):
             batch = batch.copy_extend_with_beam(self.output.beam)
         return batch
 
+    def xla_jit_scope(self):
+        """
+        With the config option ``use_xla``, the ops created in this scope are marked for XLA JIT compilation,
+        such that XLA can fuse e.g. the bias add and the activation function into the matmul.
+
+        :return: context manager
+        """
+        if not self.network.get_config().bool("use_xla", False):
+            return contextlib.nullcontext()
+        from tensorflow.python.compiler.xla import jit
+
+        return jit.experimental_jit_scope()
+
     @contextlib.contextmanager
     def var_creation_scope(self, **kwargs):
         """
@@ -1371,10 +1397,12 @@ class LayerBase(object):
                 # picks it up through logic like `update_params_from_subnet` which goes through all params
                 # and checks the name scope.
                 trainable_collection_ref = tf_compat.v1.get_collection_ref(tf_compat.v1.GraphKeys.TRAINABLE_VARIABLES)
-                if param in trainable_collection_ref:
+                if _list_contains_identical(trainable_collection_ref, param):
                     trainable_collection_ref.remove(param)
         if trainable is None:
-            trainable = param in tf_compat.v1.get_collection_ref(tf_compat.v1.GraphKeys.TRAINABLE_VARIABLES)
+            trainable = _list_contains_identical(
+                tf_compat.v1.get_collection_ref(tf_compat.v1.GraphKeys.TRAINABLE_VARIABLES), param
+            )
         if saveable is None:
             saveable = True
         if custom_update:
@@ -1637,7 +1665,12 @@ class LayerBase(object):
         :return: scalar
         :rtype: tf.Tensor
         """
-        return 2 * sum([tf.nn.l2_loss(param) for (name, param) in sorted(self.params.items())])
+        l2_losses = [tf.nn.l2_loss(param) for (name, param) in sorted(self.params.items())]
+        if not l2_losses:
+            return tf.constant(0.0)
+        # A single AddN instead of a chain of adds.
+        # Concatenating all params first and then one l2_loss would need a copy of all params.
+        return 2 * tf.add_n(l2_losses)
 
     def get_output_spatial_smoothing_energy(self):
         """
@@ -1687,7 +1720,7 @@ class LayerBase(object):
         :rtype: tf.Tensor|None
         """
         decouple_constraints = self.network.get_config().bool("decouple_constraints", False)
-        c = 0
+        cs = []  # type: typing.List[tf.Tensor]
         if self.L2:
             if decouple_constraints:
                 # Keep this logic in sync with TFUpdater.
@@ -1695,14 +1728,14 @@ class LayerBase(object):
                     assert isinstance(param, tf.Variable)
                     setattr(param, "RETURNN_constraint_L2", self.L2)
             else:
-                c += self.L2 * self.get_params_l2_norm()
+                cs.append(self.L2 * self.get_params_l2_norm())
         if self.spatial_smoothing:
-            c += self.spatial_smoothing * self.get_output_spatial_smoothing_energy()
+            cs.append(self.spatial_smoothing * self.get_output_spatial_smoothing_energy())
         if self.darc1:
-            c += self.darc1 * self.get_darc1()
-        if c is 0:
+            cs.append(self.darc1 * self.get_darc1())
+        if not cs:
             return None
-        return c
+        return tf_util.optional_add(*cs)
 
     def batch_norm(
         self,
@@ -1719,6 +1752,7 @@ class LayerBase(object):
         gamma_init=1.0,
         beta_init=0.0,
         masked_time=NotSpecified,
+        param_dtype=None,
     ):
         """
         :param Data data:
@@ -1734,6 +1768,8 @@ class LayerBase(object):
         :param str|float gamma_init: see :func:`returnn.tf.util.basic.get_initializer`, for the scale
         :param str|float beta_init: see :func:`returnn.tf.util.basic.get_initializer`, for the mean
         :param bool masked_time: flatten and mask input tensor
+        :param str|None param_dtype: dtype of the mean/variance/gamma/beta params, e.g. "float16".
+          Defaults to float32. The computation itself is still done in the dtype of the input.
         :rtype: tf.Tensor
 
         https://arxiv.org/abs/1502.03167
@@ -1780,32 +1816,33 @@ class LayerBase(object):
                 param_name_prefix = "v2_"
             else:
                 raise NotImplementedError("%s: batch_norm param_version %r" % (self, param_version))
-            stats_shape = data.get_bc_spatial_batch_shape() if param_version <= 1 else [data.dim]
+            # Computed once here, as it is needed multiple times below.
+            bc_spatial_batch_shape = data.get_bc_spatial_batch_shape()
+            stats_shape = bc_spatial_batch_shape if param_version <= 1 else [data.dim]
 
+            # All params are created within a single var creation scope.
             with self.var_creation_scope():
                 sample_mean = self.add_param(
                     tf_compat.v1.get_variable(
                         shape=stats_shape,
                         initializer=tf_compat.v1.zeros_initializer(),
                         name="%smean" % param_name_prefix,
+                        dtype=param_dtype,
                         trainable=False,
                     )
                 )
-            # Note: Our Theano implementation does not use a moving average for this.
-            with self.var_creation_scope():
+                # Note: Our Theano implementation does not use a moving average for this.
                 sample_variance = self.add_param(
                     tf_compat.v1.get_variable(
                         shape=stats_shape,
                         initializer=tf_compat.v1.ones_initializer(),
                         name="%svariance" % param_name_prefix,
+                        dtype=param_dtype,
                         trainable=False,
                     )
                 )
-            if use_std:
-                with self.var_creation_scope():
-                    from returnn.tf.util.basic import get_initializer
-
-                    gamma_initializer = get_initializer(
+                if use_std:
+                    gamma_initializer = tf_util.get_initializer(
                         gamma_init,
                         seed=self.network.random.randint(2**31) if gamma_init else 0,
                         eval_local_ns={"layer": self},
@@ -1815,16 +1852,14 @@ class LayerBase(object):
                             shape=stats_shape,
                             initializer=gamma_initializer,
                             name="%sgamma" % param_name_prefix,
+                            dtype=param_dtype,
                             trainable=True,
                         )
                     )
-            else:
-                gamma = None
-            if use_shift:
-                with self.var_creation_scope():
-                    from returnn.tf.util.basic import get_initializer
-
-                    beta_initializer = get_initializer(
+                else:
+                    gamma = None
+                if use_shift:
+                    beta_initializer = tf_util.get_initializer(
                         beta_init,
                         seed=self.network.random.randint(2**31) if beta_init else 0,
                         eval_local_ns={"layer": self},
@@ -1834,20 +1869,59 @@ class LayerBase(object):
                             shape=stats_shape,
                             initializer=beta_initializer,
                             name="%sbeta" % param_name_prefix,
+                            dtype=param_dtype,
                             trainable=True,
                         )
                     )
-            else:
-                beta = None
+                else:
+                    beta = None
+
+            def _param_value(param):
+                """
+                :param tf.Variable|tf.Tensor|None param:
+                :return: param in the dtype of the input, for the computation
+                :rtype: tf.Tensor|None
+                """
+                if param is None or param.dtype.base_dtype == tf.as_dtype(data.dtype):
+                    return param
+                return tf.cast(param, data.dtype)
+
+            fold_layer = None
+            if (
+                self.network.train_flag is False
+                and update_sample_only_in_training
+                and not force_sample
+                and param_version >= 2
+                and self.network.get_config().bool("batch_norm_fold_linear", False)
+            ):
+                fold_layer = self._get_batch_norm_fold_layer(data)
+            if fold_layer:
+                # Not in training, and no update of the running average.
+                # Then the batch norm is just a fixed affine transformation,
+                # which we can fold into the computation of the input.
+                scale = tf_compat.v1.rsqrt(_param_value(sample_variance) + epsilon)
+                if use_std:
+                    scale *= _param_value(gamma)
+                shift = -_param_value(sample_mean) * scale
+                if use_shift:
+                    shift += _param_value(beta)
+                return fold_layer.get_output_with_folded_scale_shift(scale=scale, shift=shift)
 
             use_fused = (
                 tf_util.tf_version_tuple() >= (2, 0, 0)
                 and param_version >= 2  # TF2 required for exponential_avg_factor
-                and not masked_time
+                # Masking is only relevant when there is a dynamic time axis, e.g. not for static conv outputs.
+                and not (
+                    masked_time
+                    and data.time_dim_axis is not None
+                    and data.dim_tags[data.time_dim_axis].dimension is None
+                )
                 and use_shift
                 and use_std
                 and use_sample == 0
                 and not force_sample
+                # fused_batch_norm needs float32 params.
+                and sample_mean.dtype.base_dtype == tf.float32
             )
 
             def _calc_batch_norm_fused(train_flag):
@@ -1901,15 +1975,22 @@ class LayerBase(object):
                 :rtype: (tf.Tensor, tf.Operation)
                 """
                 update_sample = (not update_sample_only_in_training) or train_flag
-                need_mean_var_cur_batch = update_sample or (use_sample != 1 and (force_sample or train_flag))
+                use_mean_var_cur_batch = use_sample != 1 and (force_sample or train_flag)
+                need_mean_var_cur_batch = update_sample or use_mean_var_cur_batch
 
                 if need_mean_var_cur_batch:
                     data_ = data
                     if masked_time:
                         data_ = data.copy_time_flattened()
-                    mean_cur_batch, variance_cur_batch = tf_compat.v1.nn.moments(
-                        data_.placeholder, axes=data_.get_axes(exclude_feature=True)
-                    )
+                    if not use_mean_var_cur_batch and data_.dtype in ("float16", "float32"):
+                        # Only for the running average, so no gradient needed. Use the single-pass fused kernel.
+                        mean_cur_batch, variance_cur_batch = tf_util.fused_moments(
+                            data_.placeholder, axis=data_.feature_dim_axis
+                        )
+                    else:
+                        mean_cur_batch, variance_cur_batch = tf_compat.v1.nn.moments(
+                            data_.placeholder, axes=data_.get_axes(exclude_feature=True)
+                        )
                     mean_cur_batch = tf.reshape(mean_cur_batch, stats_shape)
                     variance_cur_batch = tf.reshape(variance_cur_batch, stats_shape)
                 else:
@@ -1918,18 +1999,18 @@ class LayerBase(object):
                 # Use exponential moving average of batch mean.
                 # Note: We could also use cumulative moving average. Our Theano implementation does that for inference.
                 update_ops = []  # type: typing.List[tf.Operation]
-                sample_mean_, sample_variance_ = sample_mean, sample_variance
+                sample_mean_, sample_variance_ = _param_value(sample_mean), _param_value(sample_variance)
                 if update_sample:
-                    updated_sample_mean = tf_compat.v1.assign_add(
-                        sample_mean, (mean_cur_batch - sample_mean) * momentum
+                    updated_sample_mean = tf_util.assign_moving_average(
+                        sample_mean, tf.cast(mean_cur_batch, sample_mean.dtype.base_dtype), momentum
                     )
-                    updated_sample_variance = tf_compat.v1.assign_add(
-                        sample_variance, (variance_cur_batch - sample_variance) * momentum
+                    updated_sample_variance = tf_util.assign_moving_average(
+                        sample_variance, tf.cast(variance_cur_batch, sample_variance.dtype.base_dtype), momentum
                     )
                     update_ops += [updated_sample_mean.op, updated_sample_variance.op]
                     if not delay_sample_update:
-                        sample_mean_ = updated_sample_mean
-                        sample_variance_ = updated_sample_variance
+                        sample_mean_ = _param_value(updated_sample_mean)
+                        sample_variance_ = _param_value(updated_sample_variance)
                 # If train or if force_sample, use default use_sample=0.0, otherwise use_sample=1.0.
                 if force_sample or train_flag:
                     if use_sample == 1:
@@ -1944,8 +2025,8 @@ class LayerBase(object):
                     mean, variance = sample_mean_, sample_variance_
 
                 if param_version >= 2:
-                    mean = tf.reshape(mean, data.get_bc_spatial_batch_shape())
-                    variance = tf.reshape(variance, data.get_bc_spatial_batch_shape())
+                    mean = tf.reshape(mean, bc_spatial_batch_shape)
+                    variance = tf.reshape(variance, bc_spatial_batch_shape)
                 bn_ = (data.placeholder - mean) * tf_compat.v1.rsqrt(tf_util.optional_add(variance, epsilon))
                 op_ = tf.group(*update_ops)
                 return bn_, op_
@@ -1974,15 +2055,29 @@ class LayerBase(object):
                     self.network.register_post_control_dependencies([op])
             if not use_fused:
                 if use_std:
+                    gamma = _param_value(gamma)
                     if param_version >= 2:
-                        gamma = tf.reshape(gamma, data.get_bc_spatial_batch_shape())
+                        gamma = tf.reshape(gamma, bc_spatial_batch_shape)
                     bn *= gamma
                 if use_shift:
+                    beta = _param_value(beta)
                     if param_version >= 2:
-                        beta = tf.reshape(beta, data.get_bc_spatial_batch_shape())
+                        beta = tf.reshape(beta, bc_spatial_batch_shape)
                     bn += beta
             return bn
 
+    def _get_batch_norm_fold_layer(self, data):
+        """
+        In eval mode, the batch norm is a fixed affine transformation on the feature dim,
+        which can be folded into the weights and bias of some preceding linear transformation.
+
+        :param Data data: the input to :func:`batch_norm`
+        :return: layer with ``get_output_with_folded_scale_shift`` which computes data.placeholder
+            with the affine transformation folded in, or None if this is not possible
+        :rtype: LayerBase|None
+        """
+        return None
+
     def get_hidden_state(self):
         """
         If this is a recurrent layer, this would return the hidden state.
@@ -2009,6 +2104,21 @@ class LayerBase(object):
         assert not self.rec_vars_outputs
         return None
 
+    def get_last_hidden_state_parts(self, key):
+        """
+        Like :func:`get_last_hidden_state`, but when the last hidden state is a concatenation
+        over the last axis (e.g. key "*" for a state tuple), this returns the individual parts,
+        such that a user which concatenates it again with other states does not need to copy it twice.
+
+        :param int|str|None key: also the special key "*"
+        :rtype: list[tf.Tensor] | None
+        :return: optional tensors with shape (batch, dim_i), which concatenated give :func:`get_last_hidden_state`
+        """
+        h = self.get_last_hidden_state(key=key)
+        if h is None:
+            return None
+        return [h]
+
     def post_process_final_rec_vars_outputs(self, rec_vars_outputs, seq_len):
         """
         :param dict[str,tf.Tensor] rec_vars_outputs:
@@ -2147,6 +2257,19 @@ class LayerBase(object):
         return {}
 
 
+def _list_contains_identical(ls, obj):
+    """
+    Like ``obj in ls``, but only by identity.
+    ``tf.Variable.__eq__`` is slow, and checking e.g. the trainable vars collection
+    for every param would otherwise be quadratic in the number of params with a big constant.
+
+    :param list ls:
+    :param object obj:
+    :rtype: bool
+    """
+    return any(x is obj for x in ls)
+
+
 class InternalLayer(LayerBase):
     """
     This is not supposed to be used by the user.
@@ -3227,13 +3350,14 @@ class Loss(object):
             if output_flat is None:
                 output_flat = self.output_flat
             output_flat = check_input_ndim(output_flat, ndim=2)
-            last_dim = tf.rank(output_flat) - 1  # should be 1
             if self.target.sparse:
                 target_label = check_input_ndim(self.target_flat, ndim=1)
             else:
                 target_flat = check_shape_equal(self.target_flat, output_flat)
-                target_label = tf.cast(tf.argmax(target_flat, axis=last_dim), tf.int32)
-            output_label = tf.cast(tf.argmax(output_flat, axis=last_dim), target_label.dtype)
+                target_label = tf.argmax(target_flat, axis=-1, output_type=tf.int32)
+            output_label = tf_util.argmax_last_axis(output_flat)
+            if output_label.dtype != target_label.dtype:
+                output_label = tf.cast(output_label, target_label.dtype)
             not_equal = tf.not_equal(output_label, target_label)
             return self.reduce_func(tf.cast(not_equal, tf.float32))
 
@@ -86,7 +86,7 @@ def _name_scope_for_concat_src_layers(src_layers, postfix):
 
 def concat_sources(src_layers, out_dim=None, allow_broadcast_all_sources=NotSpecified):
     """
-    :param list[LayerBase] src_layers:
+    :param list[LayerBase]|tuple[LayerBase] src_layers:
     :param Dim|None out_dim:
     :param bool|NotSpecified allow_broadcast_all_sources:
     :return: data with placeholders set
@@ -110,18 +110,26 @@ def concat_sources(src_layers, out_dim=None, allow_broadcast_all_sources=NotSpec
         return data
     network = src_layers[0].network
     cache_key = (tuple(src_layers), out_dim, 0.0, None)
-    if cache_key in network.concat_sources_dropout_cache:
-        return network.concat_sources_dropout_cache[cache_key].copy()
+    cached_data = network.concat_sources_dropout_cache.get(cache_key)
+    if cached_data is not None:
+        return cached_data.copy()
     data = get_concat_sources_data_template(
         src_layers, out_dim=out_dim, allow_broadcast_all_sources=allow_broadcast_all_sources
     )
     layers_data = []
     with _name_scope_for_concat_src_layers(src_layers, "concat_sources"):
+        feature_dim_axis = data.feature_dim_axis
+        dim_tags = data.dim_tags
         for layer in src_layers:
-            assert not layer.output.sparse, "sparse concat not supported"
-            assert layer.output.dtype == data.dtype, "incompatible dtype with layer %r" % layer
-            # unbroadcast is needed for tf.concat.
-            layers_data.append(layer.output.copy_compatible_to(data, unbroadcast=True, except_feature=True))
+            layer_data = layer.output
+            assert not layer_data.sparse, "sparse concat not supported"
+            assert layer_data.dtype == data.dtype, "incompatible dtype with layer %r" % layer
+            if layer_data.feature_dim_axis != feature_dim_axis or not _same_dim_tags_except_axis(
+                layer_data.dim_tags, dim_tags, except_axis=feature_dim_axis
+            ):
+                # unbroadcast is needed for tf.concat.
+                layer_data = layer_data.copy_compatible_to(data, unbroadcast=True, except_feature=True)
+            layers_data.append(layer_data)
         data.placeholder = tf.concat(
             axis=data.feature_dim_axis, values=[layer_data.placeholder for layer_data in layers_data]
         )
@@ -135,6 +143,48 @@ def concat_sources(src_layers, out_dim=None, allow_broadcast_all_sources=NotSpec
     return data
 
 
+def _same_dim_tags_except_axis(dim_tags, other_dim_tags, except_axis):
+    """
+    Cheap check whether the layout is already the same, such that no transformation is needed.
+
+    :param Sequence[Dim] dim_tags:
+    :param Sequence[Dim] other_dim_tags:
+    :param int except_axis:
+    :rtype: bool
+    """
+    if len(dim_tags) != len(other_dim_tags):
+        return False
+    for i, (tag, other_tag) in enumerate(zip(dim_tags, other_dim_tags)):
+        if i != except_axis and tag is not other_tag:
+            return False
+    return True
+
+
+def _copy_with_majority_batch_dim_axis(common, sources):
+    """
+    :func:`Data.get_common_data` takes the layout of the first source with max ndim.
+    When most sources have another batch dim axis, prefer that layout,
+    as every source with a different layout needs a transpose in :func:`concat_sources`.
+
+    :param Data common:
+    :param list[Data] sources:
+    :return: common, maybe with moved batch dim axis
+    :rtype: Data
+    """
+    if common.batch_dim_axis is None:
+        return common
+    counts = {}  # type: typing.Dict[int,int]
+    for source in sources:
+        if source.batch_ndim == common.batch_ndim and source.batch_dim_axis is not None:
+            counts[source.batch_dim_axis] = counts.get(source.batch_dim_axis, 0) + 1
+    if not counts:
+        return common
+    batch_dim_axis = max(counts, key=lambda axis: counts[axis])
+    if counts[batch_dim_axis] <= counts.get(common.batch_dim_axis, 0):
+        return common
+    return common.copy_with_batch_dim_axis(batch_dim_axis)
+
+
 def get_concat_sources_data_template(src_layers, out_dim=None, allow_broadcast_all_sources=NotSpecified, name=None):
     """
     This just creates a template :class:`Data` instance,
@@ -161,6 +211,7 @@ def get_concat_sources_data_template(src_layers, out_dim=None, allow_broadcast_a
     common_source = Data.get_common_data(
         [s.output for s in src_layers], ignore_feature_dim=True, allow_broadcast_all_sources=allow_broadcast_all_sources
     )
+    common_source = _copy_with_majority_batch_dim_axis(common_source, [s.output for s in src_layers])
     if not common_source.have_feature_axis():  # e.g. during template construction
         return common_source
     for layer in src_layers:
@@ -196,7 +247,7 @@ def concat_sources_with_opt_dropout(
     Concatenates in the feature dim (see :func:`concat_sources`),
     and then optionally applies dropout.
 
-    :param list[LayerBase] src_layers:
+    :param list[LayerBase]|tuple[LayerBase] src_layers:
     :param Dim|None out_dim:
     :param float dropout: dropout rate that will be applied if train_flag is set or dropout_on_forward is enabled
     :param Dim|str|list[Dim|str]|None dropout_axis:
@@ -210,13 +261,16 @@ def concat_sources_with_opt_dropout(
     :rtype: Data
     """
     assert src_layers, "need source layers"
+    # The cache keys use tuple(src_layers), which does not create a new object when this is already a tuple.
+    src_layers = tuple(src_layers)
+    # This is always a new copy, so we are free to modify it.
     data = concat_sources(src_layers, out_dim=out_dim, allow_broadcast_all_sources=allow_broadcast_all_sources)
     network = src_layers[0].network
     if network.train_flag is False and not dropout_on_forward:
         # If we know that we are not training, we always disable dropout.
         dropout = 0
     if not dropout:
-        return data.copy()
+        return data
     assert not data.sparse, "need dense data when dropout is used; sources: %r" % (src_layers,)
     if dropout_axis is not None:
         dropout_axis = data.get_axes_from_description(dropout_axis, allow_int=False)
@@ -229,10 +283,10 @@ def concat_sources_with_opt_dropout(
         # Default noise_shape behavior is like old for now:
         # All dynamic dimensions (batch,time) will use the same dropout-mask broadcasted.
         dropout_noise_shape = data.get_bc_shape(dropout_noise_shape)
-    cache_key = (tuple(src_layers), out_dim, float(dropout), tuple(dropout_noise_shape))
-    if cache_key in network.concat_sources_dropout_cache:
-        return network.concat_sources_dropout_cache[cache_key].copy()
-    data = data.copy()
+    cache_key = (src_layers, out_dim, float(dropout), tuple(dropout_noise_shape))
+    cached_data = network.concat_sources_dropout_cache.get(cache_key)
+    if cached_data is not None:
+        return cached_data.copy()
     assert 0.0 < dropout < 1.0
     with _name_scope_for_concat_src_layers(src_layers, "dropout_in_train"):
         if dropout_on_forward:
@@ -295,15 +349,16 @@ class _ConcatInputLayer(LayerBase):
         self.dropout = dropout
         self.input_data = None  # type: typing.Optional[Data]
         if self.sources:
-            self.input_data = concat_sources_with_opt_dropout(
-                self.sources,
-                out_dim=in_dim,
-                dropout=dropout,
-                dropout_axis=dropout_axis,
-                dropout_noise_shape=dropout_noise_shape,
-                dropout_on_forward=dropout_on_forward,
-                allow_broadcast_all_sources=True if out_shape else NotSpecified,
-            )
+            with self.xla_jit_scope():
+                self.input_data = concat_sources_with_opt_dropout(
+                    self.sources,
+                    out_dim=in_dim,
+                    dropout=dropout,
+                    dropout_axis=dropout_axis,
+                    dropout_noise_shape=dropout_noise_shape,
+                    dropout_on_forward=dropout_on_forward,
+                    allow_broadcast_all_sources=True if out_shape else NotSpecified,
+                )
 
 
 class CopyLayer(_ConcatInputLayer):
@@ -878,20 +933,21 @@ class ActivationLayer(_ConcatInputLayer):
         :param dict[str]|None opts: for activation function, e.g. eps for safe_log
         """
         super(ActivationLayer, self).__init__(**kwargs)
-        x = self.input_data.copy_compatible_to(self.output, check_dtype=False).placeholder
-        if activation:
-            if "softmax" in activation:
-                assert (
-                    not opts
-                )  # do not set axis or anything. this handled automatically. we moved feature to last axis.
-                if self.output.dim_tags[-1].is_dynamic():
-                    self.recurrent = True
-            from returnn.tf.util.basic import get_activation_function
-
-            act_func = get_activation_function(activation)
-            self.output_before_activation = OutputWithActivation(x, act_func=act_func, act_func_opts=opts)
-        else:
-            self.output_before_activation = OutputWithActivation(x)
+        with self.xla_jit_scope():
+            x = self.input_data.copy_compatible_to(self.output, check_dtype=False).placeholder
+            if activation:
+                if "softmax" in activation:
+                    assert (
+                        not opts
+                    )  # do not set axis or anything. this handled automatically. we moved feature to last axis.
+                    if self.output.dim_tags[-1].is_dynamic():
+                        self.recurrent = True
+                from returnn.tf.util.basic import get_activation_function
+
+                act_func = get_activation_function(activation)
+                self.output_before_activation = OutputWithActivation(x, act_func=act_func, act_func_opts=opts)
+            else:
+                self.output_before_activation = OutputWithActivation(x)
         if self.output_before_activation:
             self.output.placeholder = self.output_before_activation.y
 
@@ -937,6 +993,7 @@ class BatchNormLayer(CopyLayer):
         gamma_init=NotSpecified,
         beta_init=NotSpecified,
         masked_time=NotSpecified,
+        param_dtype=NotSpecified,
         **kwargs,
     ):
         """
@@ -953,6 +1010,7 @@ class BatchNormLayer(CopyLayer):
         :param str|float gamma_init: see :func:`returnn.tf.util.basic.get_initializer`, for the scale
         :param str|float beta_init: see :func:`returnn.tf.util.basic.get_initializer`, for the mean
         :param bool masked_time: flatten and mask input tensor
+        :param str|None param_dtype: dtype of the params, e.g. "float16". float32 by default
 
         The default settings for these variables are set in the function :func:`batch_norm` of :class:`LayerBase`.
         If you do not want to change them you can leave them undefined here.
@@ -974,6 +1032,25 @@ class BatchNormLayer(CopyLayer):
             assert self.output.dim_tags[self.output.feature_dim_axis] == in_dim
         # batch norm is now applied via post_init
 
+    def _get_batch_norm_fold_layer(self, data):
+        """
+        :param Data data:
+        :rtype: LayerBase|None
+        """
+        if len(self.sources) != 1:
+            return None
+        src = self.sources[0]
+        if not isinstance(src, LinearLayer) or not src.can_fold_scale_shift():
+            return None
+        if data.placeholder is not src.output.placeholder or data.dim_tags != src.output.dim_tags:
+            return None
+        if src.output.placeholder is not src._linear_output:
+            # The source layer post-processed its output, e.g. via its own batch norm or control dependencies.
+            return None
+        if data.feature_dim_axis != src.output.feature_dim_axis:
+            return None
+        return src
+
 
 class LayerNormLayer(_ConcatInputLayer):
     """
@@ -1219,6 +1296,14 @@ class SliceLayer(_ConcatInputLayer):
         out_dim  # noqa  # via get_out_data_from_opts
         super(SliceLayer, self).__init__(**kwargs)
         axis = self.input_data.get_axis_from_description(axis)
+        if (
+            not slice_start
+            and (slice_end is None or slice_end == self.input_data.batch_shape[axis])
+            and slice_step in (None, 1)
+        ):
+            # Nothing to slice. Avoid the strided slice op.
+            self.output.placeholder = self.input_data.placeholder
+            return
         dim_slice = slice(slice_start, slice_end, slice_step)
         slices = [slice(None, None)] * axis + [dim_slice]
         y = self.input_data.placeholder[slices]
@@ -2158,87 +2243,168 @@ class LinearLayer(_ConcatInputLayer):
             else:
                 assert not bias_init
                 b = None
-
-        with tf.name_scope("linear"):
-            from returnn.tf.util.basic import dot, to_int32_64, is_gpu_available_in_session, move_axis
-
-            x = input_data.placeholder
-            ndim = x.get_shape().ndims
-
-            if self.input_data.sparse:
-                # Maybe optionally we could also use tf.contrib.layers.safe_embedding_lookup_sparse().
-                x = tf.nn.embedding_lookup(weights, to_int32_64(x))
-                ndim += 1
-            elif self.input_data.feature_dim_axis == self.input_data.batch_ndim - 1:
-                x = dot(x, weights_, transpose_b=self.use_transposed_weights)
-            elif (
-                self.input_data.is_batch_feature_major and is_gpu_available_in_session()
-            ):  # CuDNN has fast version for this
-                # Use conv instead, it has optimized code for batch-feature major (only CuDNN).
-                x_shape = None
-                if self.input_data.batch_ndim > 3:
-                    x_shape = tf.shape(x)
-                    x_shape = [x_shape[i] for i in range(self.input_data.batch_ndim)]
-                    x = tf.reshape(x, [x_shape[0], n_in, tf.reduce_prod(x_shape[2:])])  # (B,n_in,x)
-                x = tf.nn.conv1d(
-                    x,  # (B,n_in,x)
-                    filters=tf.expand_dims(weights, 0),  # (1,n_in,n_out)
-                    stride=1,
-                    padding="SAME",
-                    data_format="NCW",
-                )  # (B,n_out,x)
-                if self.input_data.batch_ndim > 3:
-                    x = tf.reshape(x, x_shape[:1] + [n_out] + x_shape[2:])  # (B,n_out,...)
-            else:
-                print("%s: Warning: inefficient implementation for input %r." % (self, self.input_data), file=log.v2)
-                x = move_axis(x, self.input_data.feature_dim_axis, -1)
-                x = dot(x, weights_, transpose_b=self.use_transposed_weights)
-                x = move_axis(x, -1, self.input_data.feature_dim_axis)
-            assert x.get_shape().ndims == ndim
-
-            if self.with_bias:
-                if self.input_data.sparse or self.input_data.feature_dim_axis == self.input_data.batch_ndim - 1:
-                    x = tf.add(x, b, name="add_bias")
+        self._weights = weights  # (n_in,n_out)
+        self._bias = b
+
+        # Covers the dot, the bias add and the activation function, such that XLA can fuse them.
+        with self.xla_jit_scope():
+            with tf.name_scope("linear"):
+                from returnn.tf.util.basic import dot, is_gpu_available_in_session, move_axis
+
+                x = input_data.placeholder
+                ndim = x.get_shape().ndims
+
+                if self.input_data.sparse:
+                    x = self._embedding_lookup(weights, x)
+                    ndim += 1
+                elif self.input_data.feature_dim_axis == self.input_data.batch_ndim - 1:
+                    x = dot(x, weights_, transpose_b=self.use_transposed_weights)
+                elif (
+                    self.input_data.is_batch_feature_major and is_gpu_available_in_session()
+                ):  # CuDNN has fast version for this
+                    # Use conv instead, it has optimized code for batch-feature major (only CuDNN).
+                    x_shape = None
+                    if self.input_data.batch_ndim > 3:
+                        x_shape = tf.shape(x)
+                        x_shape = [x_shape[i] for i in range(self.input_data.batch_ndim)]
+                        x = tf.reshape(x, [x_shape[0], n_in, tf.reduce_prod(x_shape[2:])])  # (B,n_in,x)
+                    x = tf.nn.conv1d(
+                        x,  # (B,n_in,x)
+                        filters=tf.expand_dims(weights, 0),  # (1,n_in,n_out)
+                        stride=1,
+                        padding="SAME",
+                        data_format="NCW",
+                    )  # (B,n_out,x)
+                    if self.input_data.batch_ndim > 3:
+                        x = tf.reshape(x, x_shape[:1] + [n_out] + x_shape[2:])  # (B,n_out,...)
                 else:
-                    b_bc_shape = (
-                        ([1] * self.input_data.feature_dim_axis)
-                        + [n_out]
-                        + ([1] * (self.input_data.batch_ndim - self.input_data.feature_dim_axis - 1))
+                    print(
+                        "%s: Warning: inefficient implementation for input %r." % (self, self.input_data), file=log.v2
                     )
-                    assert len(b_bc_shape) == self.input_data.batch_ndim == x.get_shape().ndims
-                    b_bc = tf.reshape(b, b_bc_shape)
-                    x = tf.add(x, b_bc, name="add_bias")
+                    x = move_axis(x, self.input_data.feature_dim_axis, -1)
+                    x = dot(x, weights_, transpose_b=self.use_transposed_weights)
+                    x = move_axis(x, -1, self.input_data.feature_dim_axis)
                 assert x.get_shape().ndims == ndim
 
-        if grad_filter:
-            x = tf_util.filter_grad(
-                x,
-                threshold=grad_filter,
-                axis=[i for i in range(input_data.batch_ndim) if i != input_data.batch_dim_axis],
-            )
-
-        if self.activation:
-            from returnn.tf.util.basic import get_activation_function
+                if self.with_bias:
+                    if ndim < 2:  # not supported by bias_add
+                        x = tf.add(x, b, name="add_bias")
+                    elif self.input_data.sparse or self.input_data.feature_dim_axis == self.input_data.batch_ndim - 1:
+                        x = tf.nn.bias_add(x, b, name="add_bias")
+                    elif self.input_data.is_batch_feature_major:
+                        x = tf.nn.bias_add(x, b, data_format="NCHW", name="add_bias")
+                    else:
+                        b_bc_shape = (
+                            ([1] * self.input_data.feature_dim_axis)
+                            + [n_out]
+                            + ([1] * (self.input_data.batch_ndim - self.input_data.feature_dim_axis - 1))
+                        )
+                        assert len(b_bc_shape) == self.input_data.batch_ndim == x.get_shape().ndims
+                        b_bc = tf.reshape(b, b_bc_shape)
+                        x = tf.add(x, b_bc, name="add_bias")
+                    assert x.get_shape().ndims == ndim
+
+            if grad_filter:
+                x = tf_util.filter_grad(
+                    x,
+                    threshold=grad_filter,
+                    axis=[i for i in range(input_data.batch_ndim) if i != input_data.batch_dim_axis],
+                )
 
-            act_func = get_activation_function(self.activation)
-            if (
-                act_func in {tf.nn.softmax, tf.nn.log_softmax}
-                and self.output.feature_dim_axis != self.output.batch_ndim - 1
-            ):
-                # Make sure we use the right axis. Don't use OutputWithActivation.
-                # noinspection PyArgumentList
-                x = act_func(x, axis=self.output.feature_dim_axis)
-                self.output_before_activation = None
+            if self.activation:
+                from returnn.tf.util.basic import get_activation_function
+
+                act_func = get_activation_function(self.activation)
+                if (
+                    act_func in {tf.nn.softmax, tf.nn.log_softmax}
+                    and self.output.feature_dim_axis != self.output.batch_ndim - 1
+                ):
+                    # Make sure we use the right axis. Don't use OutputWithActivation.
+                    # noinspection PyArgumentList
+                    x = act_func(x, axis=self.output.feature_dim_axis)
+                    self.output_before_activation = None
+                else:
+                    self.output_before_activation = OutputWithActivation(x, act_func=act_func)
             else:
-                self.output_before_activation = OutputWithActivation(x, act_func=act_func)
-        else:
-            self.output_before_activation = OutputWithActivation(x)
-        if self.output_before_activation:
-            x = self.output_before_activation.y
+                self.output_before_activation = OutputWithActivation(x)
+            if self.output_before_activation:
+                x = self.output_before_activation.y
 
         assert self.output.batch_dim_axis == self.input_data.batch_dim_axis
         assert self.output.time_dim_axis == self.input_data.time_dim_axis
         self.output.placeholder = x
+        self._linear_output = x  # before any post-processing in post_init, e.g. own batch norm
+
+    def can_fold_scale_shift(self):
+        """
+        :return: whether :func:`get_output_with_folded_scale_shift` can be used
+        :rtype: bool
+        """
+        if self.activation:
+            return False
+        return self.input_data.sparse or self.input_data.feature_dim_axis == self.input_data.batch_ndim - 1
+
+    def get_output_with_folded_scale_shift(self, scale, shift):
+        """
+        Computes ``output * scale + shift``, where the scale and shift are folded into the weights and bias,
+        i.e. ``x * (W * scale) + (b * scale + shift)``.
+        This is used e.g. for batch norm in eval mode, to avoid the extra pass over the output.
+
+        :param tf.Tensor scale: (n_out,)
+        :param tf.Tensor shift: (n_out,)
+        :return: like self.output.placeholder
+        :rtype: tf.Tensor
+        """
+        from returnn.tf.util.basic import dot
+
+        assert self.can_fold_scale_shift()
+        with tf.name_scope("linear_folded_scale_shift"):
+            weights = self._weights * scale
+            x = self.input_data.placeholder
+            if self.input_data.sparse:
+                x = self._embedding_lookup(weights, x)
+            else:
+                x = dot(x, weights)
+            if self.with_bias:
+                shift = self._bias * scale + shift
+            if x.get_shape().ndims < 2:  # not supported by bias_add
+                return tf.add(x, shift, name="add_bias")
+            return tf.nn.bias_add(x, shift, name="add_bias")
+
+    def _embedding_lookup(self, weights, x):
+        """
+        :param tf.Tensor weights: (n_in,n_out)
+        :param tf.Tensor x: sparse input, i.e. indices in [0,n_in)
+        :return: weights[x], shape x.shape + (n_out,)
+        :rtype: tf.Tensor
+        """
+        from returnn.tf.util.basic import to_int32_64
+
+        n_in = self.input_data.dim
+        if n_in > self.network.get_config().int("embedding_dense_matmul_threshold", 0):
+            # Maybe optionally we could also use tf.contrib.layers.safe_embedding_lookup_sparse().
+            return tf.nn.embedding_lookup(weights, to_int32_64(x))
+        # For small vocabs, the matmul with the one-hot input (as SparseTensor) can be faster than the gather.
+        x_flat = tf.cast(tf.reshape(x, [-1]), tf.int64)
+        n = tf.size(x_flat, out_type=tf.int64)
+        one_hot = tf.SparseTensor(
+            indices=tf.stack([tf.range(n), x_flat], axis=1),
+            values=tf.ones([n], dtype=weights.dtype),
+            dense_shape=tf.stack([n, n_in]),
+        )
+        y = tf.sparse.sparse_dense_matmul(one_hot, weights)  # (N,n_out)
+        y = tf.reshape(y, tf.concat([tf.shape(x), tf.shape(weights)[-1:]], axis=0))
+        y.set_shape(x.get_shape().concatenate(weights.get_shape()[-1:]))
+        return y
+
+    def _get_batch_norm_fold_layer(self, data):
+        """
+        :param Data data:
+        :rtype: LayerBase|None
+        """
+        if data.placeholder is self._linear_output and self.can_fold_scale_shift():
+            return self
+        return None
 
     def _get_in_split_info(self):
         """
@@ -6151,7 +6317,12 @@ class ConvLayer(_ConcatInputLayer):
         :param None|int input_split_feature_dim: if set, like input_add_feature_dim it will add a new feature dim
             which is of value input_split_feature_dim, and the original input feature dim
             will be divided by input_split_feature_dim, thus it must be a multiple of that value.
-        :param bool|NotSpecified auto_use_channel_first: convert the input to NCHW or not
+        :param bool|NotSpecified auto_use_channel_first: convert the input to NCHW or not.
+            NCHW is only used when a GPU is available, as the cuDNN kernels are faster for it.
+            The output keeps this format, so following layers (conv, pool, batch norm) avoid transposes.
+            If not specified, uses the global config option ``conv_auto_use_channel_first``,
+            or otherwise True since behavior version 9, except for float16 input,
+            where the cuDNN tensor core kernels prefer NHWC.
         :param bool|NotSpecified with_bias: if True, will add a bias to the output features.
             True by default since behavior version 10.
         :param None|str activation: if set, will apply this function at the end
@@ -6311,9 +6482,10 @@ class ConvLayer(_ConcatInputLayer):
         if pad_seq_len_to_power is not None:
             pad_seq_len_to_power = float(pad_seq_len_to_power)
             padding_for_power = []
+            x_shape = tf_util.get_shape(x)  # one shape op for all axes
             for ax in range(input_data.batch_ndim):
                 if input_data.is_axis_dynamic(ax):
-                    seq_len = tf.cast(tf.shape(x)[ax], tf.float32)
+                    seq_len = tf.cast(x_shape[ax], tf.float32)
                     padded_len = tf.math.ceil(
                         pad_seq_len_to_power ** (tf.math.ceil(tf.math.log(seq_len) / tf.math.log(pad_seq_len_to_power)))
                     )
@@ -6385,11 +6557,12 @@ class ConvLayer(_ConcatInputLayer):
 
         if pad_seq_len_to_power is not None:
             slice_size = []
+            y_shape = tf_util.get_shape(y)  # one shape op for all axes
             for ax in range(self.output.batch_ndim):
                 if self.output.is_axis_dynamic(ax):
                     slice_size.append(tf.reduce_max(self.output.get_dynamic_size(ax)))
                 else:
-                    slice_size.append(tf.shape(y)[ax])
+                    slice_size.append(y_shape[ax])
             y = tf.slice(y, begin=[0] * len(slice_size), size=slice_size)
 
         # y shape is [batch] + dynamic_dims + [n_out].
@@ -6402,26 +6575,33 @@ class ConvLayer(_ConcatInputLayer):
             assert with_bias
         self.bias_layer = None
         if with_bias:
-            if bias:
+            if bias and bias.output.dim_tags != (out_dim,):
                 self.bias_layer = bias
                 b_ = bias.output.copy_compatible_to(self.output)
                 y += b_.placeholder
             else:
-                with self.var_creation_scope():
-                    bias_initializer = get_initializer(
-                        bias_init,
-                        seed=self.network.random.randint(2**31) if bias_init else 0,
-                        eval_local_ns={"layer": self},
-                    )
-                    b = self.add_param(
-                        tf_compat.v1.get_variable(name="bias", shape=(n_out,), initializer=bias_initializer)
-                    )
-                if out_batch_feature_major:
+                if bias:  # just a [out_dim] vector, so the same as our own bias param
+                    self.bias_layer = bias
+                    b = bias.output.placeholder
+                else:
+                    with self.var_creation_scope():
+                        bias_initializer = get_initializer(
+                            bias_init,
+                            seed=self.network.random.randint(2**31) if bias_init else 0,
+                            eval_local_ns={"layer": self},
+                        )
+                        b = self.add_param(
+                            tf_compat.v1.get_variable(name="bias", shape=(n_out,), initializer=bias_initializer)
+                        )
+                # Use bias_add where possible, as Grappler can fuse conv + bias_add (+ relu) into a single op.
+                if not out_batch_feature_major:
+                    y = tf.nn.bias_add(y, b)
+                elif num_batch_dims == 1:
+                    y = tf.nn.bias_add(y, b, data_format="NCHW")  # feature axis 1, for any rank
+                else:
                     y += (
                         Data(name="bias", placeholder=b, dim_tags=[out_dim]).copy_compatible_to(self.output).placeholder
                     )
-                else:
-                    y += b
         if activation:
             from returnn.tf.util.basic import get_activation_function
 
@@ -6547,10 +6727,10 @@ class ConvLayer(_ConcatInputLayer):
             )
             if sorted(axes) != axes:
                 # Sort them such that the convolution is correct.
+                # Do this via a single transpose, with the spatial dims in order starting at the first spatial axis.
                 first = min(axes)
-                for i, d in enumerate(in_spatial_dims):
-                    a = input_data.get_axis_from_description(d)
-                    input_data = input_data.copy_move_axis(old_axis=a, new_axis=first + i)
+                remaining_axes = [a for a in range(input_data.batch_ndim) if a not in axes]
+                input_data = input_data.copy_transpose(remaining_axes[:first] + axes + remaining_axes[first:])
                 axes = [input_data.get_axis_from_description(d) for d in in_spatial_dims]
                 assert sorted(axes) == axes
             expected_dims = {batch_dim} | set(in_spatial_dims)
@@ -6567,13 +6747,12 @@ class ConvLayer(_ConcatInputLayer):
             # But also this is a useful feature in general.
             # Move all batch dims right next to each other in front. But keep the order.
             expected_non_batch_dims = expected_dims - {batch_dim}
-            batch_axis_idx = 0
-            for a, d in enumerate(input_data.dim_tags):
-                if d not in expected_non_batch_dims:
-                    if a != batch_axis_idx:
-                        input_data = input_data.copy_move_axis(old_axis=a, new_axis=batch_axis_idx)
-                    batch_axis_idx += 1
-            num_batch_dims = batch_axis_idx
+            batch_axes = [a for a, d in enumerate(input_data.dim_tags) if d not in expected_non_batch_dims]
+            num_batch_dims = len(batch_axes)
+            if batch_axes != list(range(num_batch_dims)):
+                input_data = input_data.copy_transpose(
+                    batch_axes + [a for a in range(input_data.batch_ndim) if a not in batch_axes]
+                )
         else:  # no specified in_spatial_dims
             batch_axes = {input_data.batch_dim_axis}
             inside_rec_time_dim = network.get_inside_rec_time_dim(inside_loop=True)
@@ -6581,12 +6760,12 @@ class ConvLayer(_ConcatInputLayer):
             if over_rec_time_dim and not inside_rec_time_dim and over_rec_time_dim in input_data.dim_tags:
                 # It is moved out of a rec loop. This axis can not be used.
                 batch_axes.add(input_data.get_axis_from_description(over_rec_time_dim))
-            batch_axis_idx = 0
-            for a in sorted(batch_axes):
-                if a != batch_axis_idx:
-                    input_data = input_data.copy_move_axis(old_axis=a, new_axis=batch_axis_idx)
-                batch_axis_idx += 1
-            num_batch_dims = batch_axis_idx
+            batch_axes = sorted(batch_axes)
+            num_batch_dims = len(batch_axes)
+            if batch_axes != list(range(num_batch_dims)):
+                input_data = input_data.copy_transpose(
+                    batch_axes + [a for a in range(input_data.batch_ndim) if a not in batch_axes]
+                )
             in_spatial_dims = [
                 d
                 for (i, d) in enumerate(input_data.dim_tags)
@@ -6822,6 +7001,11 @@ class ConvLayer(_ConcatInputLayer):
         time_dim_axis = data.time_dim_axis
         # Swap the dims if the input dim order doesn't fit the flag auto_use_channel_first.
         if auto_use_channel_first is NotSpecified:
+            auto_use_channel_first = network.get_config().bool("conv_auto_use_channel_first", None)
+        if auto_use_channel_first is None and data.dtype == "float16":
+            # The cuDNN tensor core kernels for float16 work on NHWC, so NCHW would need extra transposes.
+            auto_use_channel_first = False
+        if auto_use_channel_first is None:
             auto_use_channel_first = True if BehaviorVersion.get() >= 9 else False
         feature_dim_axis = len(dim_tags) - 1
         if auto_use_channel_first or input_data.feature_dim_axis == num_batch_dims:  # batch-feature-major
@@ -6836,6 +7020,7 @@ class ConvLayer(_ConcatInputLayer):
         out = Data(
             name="%s_output" % name,
             dim_tags=dim_tags,
+            dtype=data.dtype,
             time_dim_axis=time_dim_axis,
             batch=data.batch,
             beam=data.beam,
@@ -6928,7 +7113,10 @@ class PoolLayer(_ConcatInputLayer):
         :param list[Dim|str]|None in_spatial_dims:
         :param Dim|None out_dim:
         :param list[Dim]|None out_spatial_dims:
-        :param bool|NotSpecified use_channel_first: if set, will transform input to NCHW format
+        :param bool|NotSpecified use_channel_first: if set, will transform input to NCHW format.
+            Like ``auto_use_channel_first`` of :class:`ConvLayer`,
+            i.e. by default NCHW when a GPU is available, except for float16 input.
+            The output keeps the format, so a following conv or pool layer does not need to transpose again.
         :param bool use_time_mask:
         """
         assert "n_out" not in kwargs
@@ -7730,15 +7918,15 @@ class ReduceLayer(_ConcatInputLayer):
                 out_time_dim_axis = NotSpecified
             if out_feature_dim_axis in axes:
                 out_feature_dim_axis = NotSpecified
-            for i in reversed(sorted(set(axes))):
-                del y_dim_tags[i]
-            for i in reversed(sorted(set(axes))):
-                if out_batch_dim_axis and i < out_batch_dim_axis:
-                    out_batch_dim_axis -= 1
-                if out_time_dim_axis and out_time_dim_axis is not NotSpecified and i < out_time_dim_axis:
-                    out_time_dim_axis -= 1
-                if out_feature_dim_axis and out_feature_dim_axis is not NotSpecified and i < out_feature_dim_axis:
-                    out_feature_dim_axis -= 1
+            axes_set = set(axes)
+            y_dim_tags = [d for i, d in enumerate(y_dim_tags) if i not in axes_set]
+            # Each remaining axis is shifted by the number of reduced axes in front of it.
+            if out_batch_dim_axis:
+                out_batch_dim_axis -= len([i for i in axes_set if i < out_batch_dim_axis])
+            if out_time_dim_axis and out_time_dim_axis is not NotSpecified:
+                out_time_dim_axis -= len([i for i in axes_set if i < out_time_dim_axis])
+            if out_feature_dim_axis and out_feature_dim_axis is not NotSpecified:
+                out_feature_dim_axis -= len([i for i in axes_set if i < out_feature_dim_axis])
         sparse_out = mode.lower().startswith("arg")
         sparse_dim = None
         if sparse_out:
@@ -7832,8 +8020,8 @@ class SqueezeLayer(_ConcatInputLayer):
             input_data = input_data.copy_with_batch_dim_axis(enforce_batch_dim_axis)
         axes = self._get_axes(axis, input_data=input_data)
         x = input_data.placeholder
-        for i in reversed(sorted(axes)):
-            x = tf.squeeze(x, axis=i)
+        if axes:
+            x = tf.squeeze(x, axis=sorted(axes))
         self.output.placeholder = x
         self.output.size_placeholder = {
             i - len([j for j in axes if j < input_data.get_batch_axis(i)]): size
@@ -9451,16 +9639,13 @@ class CombineLayer(LayerBase):
                         name="b", shape=(self.output.dim,), initializer=tf.constant_initializer(value=0)
                     )
                 )
-            x += b
-        if activation:
-            from returnn.tf.util.basic import get_activation_function
-
-            act_func = get_activation_function(activation)
-            self.output_before_activation = OutputWithActivation(x, act_func=act_func)
-        else:
-            self.output_before_activation = OutputWithActivation(x)
-        x = self.output_before_activation.y
-        self.output.placeholder = x
+            if self.output.batch_ndim >= 2 and self.output.feature_dim_axis == self.output.batch_ndim - 1:
+                x = tf.nn.bias_add(x, b, name="add_bias")
+            else:  # not supported by bias_add
+                x += b
+        act_func = tf_util.get_activation_function(activation) if activation else None
+        self.output_before_activation = OutputWithActivation(x, act_func=act_func)
+        self.output.placeholder = self.output_before_activation.y
 
     @classmethod
     def get_out_data_from_opts(
@@ -9553,13 +9738,28 @@ class CombineLayer(LayerBase):
             x = fn(x, x2)
         return x
 
+    def _op_kind_add(self, sources):
+        """
+        :param list[LayerBase] sources:
+        :rtype: tf.Tensor
+        """
+        if len(sources) > 2:
+            xs = [source.output.copy_compatible_to(self.output, check_sparse=False) for source in sources]
+            if all(x.batch_shape == self.output.batch_shape for x in xs):
+                # No broadcasting needed. A single op instead of a chain of adds with intermediate results.
+                return tf.add_n([x.placeholder for x in xs])
+        return self._op_dense_fn(sources, tf.add, self.output)
+
     def _op_kind_average(self, sources):
         """
         :param list[LayerBase] sources:
         :rtype: tf.Tensor
         """
-        x = self._op_dense_fn(sources, tf.add, self.output)
-        x /= len(sources)
+        x = self._op_kind_add(sources)
+        if x.dtype.is_floating:
+            x *= 1.0 / len(sources)  # multiply by the reciprocal, cheaper than a division
+        else:
+            x /= len(sources)
         return x
 
     def _op_kind_eval(self, sources, eval_str, eval_locals=None):
@@ -9633,6 +9833,8 @@ class CombineLayer(LayerBase):
             "sub": "subtract",
             "mul": "multiply",
         }.get(kind, kind)
+        if kind == "add":
+            return self._op_kind_add(sources)
         if hasattr(tf, "math") and hasattr(tf.math, kind):
             tf_func = getattr(tf.math, kind)
         elif hasattr(tf, kind):
@@ -10819,6 +11021,16 @@ class SubnetworkLayer(LayerBase):
             return h
         return super(SubnetworkLayer, self).get_last_hidden_state(key=key)
 
+    def get_last_hidden_state_parts(self, key):
+        """
+        :param int|str|None key: also the special key "*"
+        :rtype: list[tf.Tensor]|None
+        """
+        parts = self.subnetwork.get_default_output_layer().get_last_hidden_state_parts(key=key)
+        if parts is not None:
+            return parts
+        return super(SubnetworkLayer, self).get_last_hidden_state_parts(key=key)
+
     @classmethod
     def get_rec_initial_extra_outputs(cls, batch_dim, rec_layer, encapsulate=False, **kwargs):
         """
@@ -11685,25 +11897,25 @@ class FramewiseStatisticsLayer(LayerBase):
         flat_last_dim = output_before_softmax_flat.get_shape().ndims - 1
         assert flat_last_dim == 1
         output_flat = flatten_with_seq_len_mask(output.placeholder, output_seq_lens, time_major=output.is_time_major)
-        output_flat_argmax = tf.cast(tf.argmax(output_before_softmax_flat, axis=flat_last_dim), "int32")
+        output_flat_argmax = tf_util.argmax_last_axis(output_before_softmax_flat)
         frame_error = tf.not_equal(output_flat_argmax, target_flat)
         # target_flat is shape (time,) -> index.
-        target_flat_exp = tf.stack([tf.range(tf.shape(target_flat)[0], dtype=tf.int32), target_flat], axis=1)
-        true_label_prob = tf.gather_nd(output_flat, target_flat_exp)
+        true_label_prob = tf_util.batch_gather(output_flat, target_flat)
         true_label_prob.set_shape(tf.TensorShape([None]))
         true_label_prob_i32 = tf.clip_by_value(
             tf.cast(tf.round(true_label_prob * histogram_num_bins), tf.int32), 0, histogram_num_bins - 1
         )
-        true_label_prob_histogram = tf.stack(
-            [tf.equal(true_label_prob_i32, i) for i in range(histogram_num_bins)], axis=1
+        true_label_prob_histogram = tf.one_hot(
+            true_label_prob_i32, depth=histogram_num_bins, on_value=True, off_value=False, dtype=tf.bool
         )
         true_label_prob_histogram.set_shape(tf.TensorShape([None, histogram_num_bins]))
 
-        mask_no_sil = tf.not_equal(target_flat, sil_label_idx)
         mask_sil = tf.equal(target_flat, sil_label_idx)
+        # Indices of the sil frames, computed once, and then used for all the stats below.
+        idx_sil = tf.squeeze(tf.where(mask_sil), axis=1)
         seq_len = tf.reduce_sum(target_seq_lens)
         seq_len_sil = tf.reduce_sum(tf.cast(mask_sil, tf.int32))
-        seq_len_no_sil = tf.reduce_sum(tf.cast(mask_no_sil, tf.int32))
+        seq_len_no_sil = seq_len - seq_len_sil
 
         with self.var_creation_scope():
             accumulated_seq_len = tf.Variable(
@@ -11728,23 +11940,22 @@ class FramewiseStatisticsLayer(LayerBase):
             "frame_error": frame_error,
             "true_label_prob_histogram": true_label_prob_histogram,
         }.items():
-            for _k2 in ["", "_sil", "_no_sil"]:
+            if _v.dtype.is_floating:
+                acc_dtype = "float64"
+            else:
+                acc_dtype = "int64"
+            # Sum over all frames and over the sil frames. The no-sil sum is the difference,
+            # such that we do not need to read the frames again for that.
+            v_sum = tf.reduce_sum(tf.cast(_v, acc_dtype), axis=0)
+            v_sum_sil = tf.reduce_sum(tf.cast(tf.gather(_v, idx_sil), acc_dtype), axis=0)
+            for _k2, v_sum_, seq_len_, acc_seq_len in [
+                ("", v_sum, seq_len, accumulated_seq_len),
+                ("_sil", v_sum_sil, seq_len_sil, accumulated_seq_len_sil),
+                ("_no_sil", v_sum - v_sum_sil, seq_len_no_sil, accumulated_seq_len_no_sil),
+            ]:
                 k = _k + _k2
-                v = _v
-                acc_seq_len = accumulated_seq_len
-                if k.endswith("_no_sil"):
-                    v = tf.boolean_mask(v, mask_no_sil)
-                    acc_seq_len = accumulated_seq_len_no_sil
-                elif k.endswith("_sil"):
-                    v = tf.boolean_mask(v, mask_sil)
-                    acc_seq_len = accumulated_seq_len_sil
-                v_f32 = tf.cast(v, tf.float32)
-                self.stats["batch_%s" % k] = tf.reduce_mean(v_f32, axis=0)
-                if v.dtype.is_floating:
-                    acc_dtype = "float64"
-                else:
-                    acc_dtype = "int64"
-                acc_shape = v.get_shape().as_list()[1:]
+                self.stats["batch_%s" % k] = tf.cast(v_sum_, tf.float32) / tf.cast(seq_len_, tf.float32)
+                acc_shape = _v.get_shape().as_list()[1:]
                 assert all(acc_shape)
                 with self.var_creation_scope():
                     acc_v = tf.Variable(
@@ -11753,15 +11964,15 @@ class FramewiseStatisticsLayer(LayerBase):
                         dtype=acc_dtype,
                         trainable=False,
                     )
-                acc_v = tf_compat.v1.assign_add(acc_v, tf.reduce_sum(tf.cast(v, acc_dtype), axis=0))
+                acc_v = tf_compat.v1.assign_add(acc_v, v_sum_)
                 self.stats["accumulated_%s" % k] = tf.cast(acc_v, tf.float64) / tf.cast(acc_seq_len, tf.float64)
 
-        self.stats["batch_loss_perplexity"] = tf.exp(self.stats["batch_loss_ce"])
-        self.stats["batch_loss_perplexity_sil"] = tf.exp(self.stats["batch_loss_ce_sil"])
-        self.stats["batch_loss_perplexity_no_sil"] = tf.exp(self.stats["batch_loss_ce_no_sil"])
-        self.stats["accumulated_loss_perplexity"] = tf.exp(self.stats["accumulated_loss_ce"])
-        self.stats["accumulated_loss_perplexity_sil"] = tf.exp(self.stats["accumulated_loss_ce_sil"])
-        self.stats["accumulated_loss_perplexity_no_sil"] = tf.exp(self.stats["accumulated_loss_ce_no_sil"])
+        # One exp per prefix on the stacked CE scalars. (batch is float32, accumulated is float64.)
+        for prefix in ["batch", "accumulated"]:
+            postfixes = ["", "_sil", "_no_sil"]
+            ppl = tf.exp(tf.stack([self.stats["%s_loss_ce%s" % (prefix, postfix)] for postfix in postfixes]))
+            for postfix, v in zip(postfixes, tf.unstack(ppl)):
+                self.stats["%s_loss_perplexity%s" % (prefix, postfix)] = v
 
     @classmethod
     def get_out_data_from_opts(cls, **kwargs):
@@ -12150,10 +12361,8 @@ class CrossEntropyLoss(Loss):
         else:
             raise NotImplementedError(f"input_type {self.input_type!r}")
         assert output_flat is not None
-        target_flat_exp = tf.stack(
-            [tf.range(tf.shape(self.target_flat)[0], dtype=tf.int32), tf.cast(self.target_flat, tf.int32)], axis=1
-        )  # (time,2)
-        out = tf.gather_nd(output_flat, target_flat_exp, name="ce_output_target_scores")
+        with tf.name_scope("ce_output_target_scores"):
+            out = tf_util.batch_gather(output_flat, self.target_flat)  # (time,)
         return out
 
     def get_value(self):
@@ -12172,6 +12381,7 @@ class CrossEntropyLoss(Loss):
             else:
                 raise NotImplementedError(f"input_type {self.input_type!r}")
             if self.target.sparse:
+                target_scores = None  # type: typing.Optional[tf.Tensor]  # (time_flat,), std-prob space
                 if self.use_fused and output_before_softmax_flat is not None:
                     target_flat = self.target_flat
                     if self.debug_dump:
@@ -12190,6 +12400,9 @@ class CrossEntropyLoss(Loss):
                         out = tf.nn.sparse_softmax_cross_entropy_with_logits(
                             logits=output_before_softmax_flat, labels=to_int32_64(target_flat)
                         )  # shape(labels)
+                        if self.focal_loss_factor:
+                            # The CE is -log(p_target), so we do not need the full softmax to get p_target.
+                            target_scores = tf.exp(-out)
                     if self.debug_dump:
                         out = py_print(out, [tf.exp(tf.negative(out))], summarize=10000, message="target prob ")
                 else:
@@ -12210,9 +12423,12 @@ class CrossEntropyLoss(Loss):
                             gaussian=self.label_smoothing_gaussian,
                         )  # shape(labels)
                     else:
-                        out = -safe_log(self.get_output_target_scores(), **self.safe_log_opts)
+                        target_scores = self.get_output_target_scores()
+                        out = -safe_log(target_scores, **self.safe_log_opts)
                 if self.focal_loss_factor:
-                    out *= (1.0 - self.get_output_target_scores()) ** self.focal_loss_factor
+                    if target_scores is None:
+                        target_scores = self.get_output_target_scores()
+                    out *= (1.0 - target_scores) ** self.focal_loss_factor
                 if self.fake_upper_bound is not None:
                     out = minimum_with_identity_grad(out, self.fake_upper_bound)
                 return self.reduce_func(out)
@@ -12305,12 +12521,12 @@ class GenericCELoss(Loss):
             :param tf.Tensor target:
             :rtype: tf.Tensor
             """
-            nlog_scores = -tf_compat.v1.log(tf.clip_by_value(y, 1.0e-20, 1.0e20))  # (time,dim)
-            # target is shape (time,) -> index.
-            target_exp = tf.stack([tf.range(tf.shape(target)[0], dtype=tf.int32), target], axis=1)  # (time,2)
-            # Thus K == 2. gather_nd out will be (target_exp.shape[0],) = (time,).
-            gathered = tf.gather_nd(nlog_scores, target_exp)  # (time,)
-            return self.reduce_func(gathered)
+            y.set_shape((None, None))  # (time,dim)
+            target.set_shape((None,))  # (time,)
+            # target is shape (time,) -> index. Gather first, such that we only need the log of the target scores.
+            gathered = tf_util.batch_gather(y, target)  # (time,)
+            nlog_scores = -tf_compat.v1.log(tf.clip_by_value(gathered, 1.0e-20, 1.0e20))  # (time,)
+            return self.reduce_func(nlog_scores)
 
         # noinspection PyUnusedLocal
         def loss_grad(op, grad):
@@ -12352,7 +12568,11 @@ class GenericCELoss(Loss):
         x = flatten_with_seq_len_mask(x, seq_lens=self.output_seq_lens, time_major=self.output.is_time_major)
         y = flatten_with_seq_len_mask(y, seq_lens=self.output_seq_lens, time_major=self.output.is_time_major)
         assert y.get_shape().ndims == 2
-        y /= tf.reduce_sum(y, axis=1, keepdims=True)
+        if self.output_with_activation.act_func is tf.exp:
+            # exp(x) / sum(exp(x)) == softmax(x), which is cheaper and numerically more stable.
+            y = tf.nn.softmax(x)
+        else:
+            y /= tf.reduce_sum(y, axis=1, keepdims=True)
         assert self.output.dim == self.target.dim
         assert self.target.sparse
         return self._loss_func(x, y, grad_f, self.target_flat)
@@ -12376,6 +12596,7 @@ class CtcLoss(Loss):
         ctc_opts=None,
         use_native=False,
         use_viterbi=False,
+        use_ctc_loss_v2=False,
         **kwargs,
     ):
         """
@@ -12387,12 +12608,15 @@ class CtcLoss(Loss):
         :param dict[str]|None ctc_opts: other kwargs used for tf.nn.ctc_loss
         :param bool use_native: use our native implementation (:func:`TFNativeOp.ctc_loss`)
         :param bool use_viterbi: instead of full-sum, use only best path (via :func:`ctc_loss_viterbi`)
+        :param bool use_ctc_loss_v2: use the TF2 ``tf.nn.ctc_loss``, which selects the cuDNN CTC kernel on GPU.
+            Note that ctc_opts are then passed to that function, and :func:`get_soft_alignment` is not supported.
         """
         super(CtcLoss, self).__init__(**kwargs)
         self.target_collapse_repeated = target_collapse_repeated
         self.auto_clip_target_len = auto_clip_target_len
         self.output_in_log_space = output_in_log_space
         self._target_sparse_labels = None
+        self._output_logits_by_time_major = {}  # type: typing.Dict[bool,tf.Tensor]
         self._ctc_loss = None  # set in get_value
         self.beam_width = beam_width
         if ctc_opts is None:
@@ -12400,12 +12624,14 @@ class CtcLoss(Loss):
         self.ctc_opts = ctc_opts
         self.use_native = use_native
         self.use_viterbi = use_viterbi
+        self.use_ctc_loss_v2 = use_ctc_loss_v2
 
     def init(self, **kwargs):
         """
         See super.
         """
         self._target_sparse_labels = None
+        self._output_logits_by_time_major.clear()
         super(CtcLoss, self).init(**kwargs)
 
     def _get_target_sparse_labels(self):
@@ -12449,6 +12675,23 @@ class CtcLoss(Loss):
         assert logits.get_shape().dims[2].value == self.target.dim + 1  # one more for blank
         return logits
 
+    def _get_output_logits(self, time_major):
+        """
+        Like :func:`get_output_logits`, but cached, such that get_value and get_error share the same tensors.
+
+        :param bool time_major:
+        :return: outputs in log-space / logits, (T,B,N) if time_major else (B,T,N)
+        :rtype: tf.Tensor
+        """
+        if time_major in self._output_logits_by_time_major:
+            return self._output_logits_by_time_major[time_major]
+        if self.output.is_time_major == time_major:
+            logits = self.get_output_logits()
+        else:
+            logits = tf.transpose(self._get_output_logits(time_major=not time_major), [1, 0, 2])
+        self._output_logits_by_time_major[time_major] = logits
+        return logits
+
     def get_soft_alignment(self):
         """
         Also called the Baum-Welch-alignment.
@@ -12477,7 +12720,7 @@ class CtcLoss(Loss):
         if not self.target.sparse:
             raise Exception("CTC target expected to be sparse (symbols)")
         with tf.name_scope("loss_ctc"):
-            logits = self.get_output_logits()
+            logits = self._get_output_logits(time_major=True)
             seq_lens = self.output_seq_lens
             labels = self._get_target_sparse_labels()
             # logits can be unnormalized. It will do softmax internally.
@@ -12488,7 +12731,7 @@ class CtcLoss(Loss):
                 self._ctc_loss = ctc_loss_viterbi(
                     logits=logits,
                     logits_seq_lens=seq_lens,
-                    logits_time_major=self.output.is_time_major,
+                    logits_time_major=True,
                     targets=self.target.get_placeholder_as_batch_major(),
                     targets_seq_lens=self.target_seq_lens,
                 )
@@ -12498,17 +12741,28 @@ class CtcLoss(Loss):
                 self._ctc_loss = ctc_loss(
                     logits=logits,
                     logits_seq_lens=seq_lens,
-                    logits_time_major=self.output.is_time_major,
+                    logits_time_major=True,
                     targets=self.target.get_placeholder_as_batch_major(),
                     targets_seq_lens=self.target_seq_lens,
                     **self.ctc_opts,
                 )
+            elif self.use_ctc_loss_v2:
+                ctc_loss_v2 = tf_compat.v2.nn.ctc_loss if tf_compat.v2 else tf_compat.v1.nn.ctc_loss_v2
+                self._ctc_loss = ctc_loss_v2(
+                    labels=labels,
+                    logits=logits,
+                    label_length=None,
+                    logit_length=seq_lens,
+                    logits_time_major=True,
+                    blank_index=self.target.dim,
+                    **self.ctc_opts,
+                )
             else:
                 self._ctc_loss = tf_compat.v1.nn.ctc_loss(
                     inputs=logits,
                     labels=labels,
                     sequence_length=seq_lens,
-                    time_major=self.output.is_time_major,
+                    time_major=True,
                     **self.ctc_opts,
                 )
             loss = self._ctc_loss  # shape (batch,)
@@ -12521,25 +12775,30 @@ class CtcLoss(Loss):
         if not self.target.sparse:
             raise Exception("CTC target expected to be sparse (symbols)")
         with tf.name_scope("loss_ctc_error"):
-            logits = self.get_output_logits()
-            if not self.output.is_time_major:
-                logits = tf.transpose(logits, [1, 0, 2])  # (B,T,N) => (T,B,N)
+            logits = self._get_output_logits(time_major=True)  # (T,B,N)
             seq_lens = self.output_seq_lens
+            labels = self._get_target_sparse_labels()
+
+            def _greedy_decode():
+                # Batched argmax, collapse and blank removal, all via TF ops, thus also runs on GPU.
+                return tf.cast(
+                    tf_util.ctc_greedy_decode(logits=logits, seq_lens=seq_lens, time_major=True), labels.dtype
+                )
+
             if self.beam_width > 1:
                 assert not self.use_native, "use beam_width=1 with use_native"
                 decoded = self.base_network.cond_on_train(
-                    lambda: tf.nn.ctc_greedy_decoder(inputs=logits, sequence_length=seq_lens)[0][0],
-                    lambda: tf.nn.ctc_beam_search_decoder(
-                        inputs=logits, sequence_length=seq_lens, beam_width=self.beam_width
-                    )[0][0],
+                    _greedy_decode,
+                    lambda: tf.cast(
+                        tf.nn.ctc_beam_search_decoder(
+                            inputs=logits, sequence_length=seq_lens, beam_width=self.beam_width
+                        )[0][0],
+                        labels.dtype,
+                    ),
                 )
             else:
-                if self.use_native or self.use_viterbi:
-                    decoded = tf_util.ctc_greedy_decode(logits=logits, seq_lens=seq_lens, time_major=True)
-                else:
-                    decoded = tf.nn.ctc_greedy_decoder(inputs=logits, sequence_length=seq_lens)[0][0]
-            labels = self._get_target_sparse_labels()
-            error = tf.edit_distance(hypothesis=tf.cast(decoded, labels.dtype), truth=labels, normalize=False)
+                decoded = _greedy_decode()
+            error = tf.edit_distance(hypothesis=decoded, truth=labels, normalize=False)
             return self.reduce_func(error)
 
     @classmethod
@@ -128,7 +128,9 @@ class RecLayer(_ConcatInputLayer):
         :param str bias_init: see :func:`returnn.tf.util.basic.get_initializer`
         :param bool|None optimize_move_layers_out: will automatically move layers out of the loop when possible
         :param bool cheating: Unused, is now part of ChoiceLayer
-        :param bool unroll: if possible, unroll the loop (implementation detail)
+        :param bool unroll: if possible, unroll the loop (implementation detail).
+          Only for RNN cell units, and this needs an int max_seq_len.
+          A subnetwork unit is always executed via tf.while_loop, as its layers are constructed only once.
         :param bool|None back_prop: for tf.while_loop. the default will use self.network.train_flag
         :param bool use_global_rec_step_offset:
         :param bool include_eos: for search, whether we should include the frame where "end" is True
@@ -622,6 +624,11 @@ class RecLayer(_ConcatInputLayer):
 
     @classmethod
     def _create_rnn_cells_dict(cls):
+        """
+        Scans the modules for all known cells, once, see :func:`get_rnn_cell_class`.
+        The dict is filled locally and only then assigned,
+        so that concurrent or failed first calls never see a partially filled dict.
+        """
         import returnn.tf.native_op as tf_native_op
         from returnn.tf.util.basic import is_gpu_available_in_session
 
@@ -644,6 +651,8 @@ class RecLayer(_ConcatInputLayer):
             except ImportError:
                 pass
 
+        rnn_cells_dict = {}
+
         # noinspection PyShadowingNames
         def maybe_add(key, v):
             """
@@ -657,8 +666,8 @@ class RecLayer(_ConcatInputLayer):
                 if name.endswith("Cell"):
                     name = name[: -len("Cell")]
                 name = name.lower()
-                assert cls._rnn_cells_dict.get(name) in [v, None]
-                cls._rnn_cells_dict[name] = v
+                assert rnn_cells_dict.get(name) in [v, None]
+                rnn_cells_dict[name] = v
 
         for key, v in globals().items():
             maybe_add(key, v)
@@ -674,6 +683,7 @@ class RecLayer(_ConcatInputLayer):
                 maybe_add(key, v)
         # Alias for the standard LSTM cell, because self._get_cell(unit="lstm") will use "NativeLSTM" by default.
         maybe_add("StandardLSTM", rnn_cell.LSTMCell)
+        RecLayer._rnn_cells_dict = rnn_cells_dict  # not on a subclass, to share it
 
     _warn_msg_once_for_cell_name = set()
 
@@ -700,17 +710,18 @@ class RecLayer(_ConcatInputLayer):
         # but you explicitly need to specify `"unit_opts": {"forget_bias": 0.0}`, otherwise it will be wrong.
         from returnn.tf.util.basic import is_gpu_available_in_session
 
-        if not is_gpu_available_in_session():
-            m = {"cudnnlstm": "LSTMBlockFused", "cudnngru": "GRUBlock"}
-            if name.lower() in m:
-                if name.lower() not in cls._warn_msg_once_for_cell_name:
-                    print(
-                        "You have selected unit %r in a rec layer which is for GPU only, so we are using %r instead."
-                        % (name, m[name.lower()]),
-                        file=log.v2,
-                    )
-                    cls._warn_msg_once_for_cell_name.add(name.lower())
-                name = m[name.lower()]
+        m = {"cudnnlstm": "LSTMBlockFused", "cudnngru": "GRUBlock"}
+        if name.lower() in m and (not is_gpu_available_in_session() or name.lower() not in cls._rnn_cells_dict):
+            # Not on GPU, or tf.contrib.cudnn_rnn is not available (TF 2).
+            if name.lower() not in cls._warn_msg_once_for_cell_name:
+                print(
+                    "You have selected unit %r in a rec layer which is not available here"
+                    " (GPU only, and needs tf.contrib.cudnn_rnn), so we are using %r instead."
+                    % (name, m[name.lower()]),
+                    file=log.v2,
+                )
+                cls._warn_msg_once_for_cell_name.add(name.lower())
+            name = m[name.lower()]
         if name.lower() in ["lstmp", "lstm"]:
             name = cls._default_lstm_unit
         if tf_util.have_min_tf_version((2, 0)) and name.lower() in ["LSTMBlock".lower(), "LSTMBlockFused".lower()]:
@@ -977,7 +988,7 @@ class RecLayer(_ConcatInputLayer):
         assert not self.input_data.sparse
         in_data, x, seq_len, initial_state = self._get_input(add_time_dim=False)
         if self._direction == -1:
-            x = tf_compat.v1.reverse_sequence(x, seq_lengths=seq_len, batch_dim=1, seq_dim=0)
+            x = tf_util.reverse_sequence_time_major(x, seq_len)
         if isinstance(cell, BaseRNNCell):
             with tf_compat.v1.variable_scope(
                 tf_compat.v1.get_variable_scope(), initializer=self._fwd_weights_initializer
@@ -1045,7 +1056,7 @@ class RecLayer(_ConcatInputLayer):
         else:
             raise Exception("invalid type: %s" % type(cell))
         if self._direction == -1:
-            y = tf_compat.v1.reverse_sequence(y, seq_lengths=seq_len, batch_dim=1, seq_dim=0)
+            y = tf_util.reverse_sequence_time_major(y, seq_len)
         y, final_state = self._post_proc_output_cell_strict(
             y, in_data=in_data, final_state=final_state, added_time_dim=False
         )
@@ -1146,7 +1157,7 @@ class RecLayer(_ConcatInputLayer):
         in_data, x, seq_len, initial_state = self._get_input()
         n_batch = tf.shape(seq_len)[0]
         if self._direction == -1:
-            x = tf_compat.v1.reverse_sequence(x, seq_lengths=seq_len, batch_dim=1, seq_dim=0)
+            x = tf_util.reverse_sequence_time_major(x, seq_len)
         with tf_compat.v1.variable_scope("cudnn"):
             cell.build(x.get_shape())
             num_layers = 1
@@ -1191,7 +1202,7 @@ class RecLayer(_ConcatInputLayer):
             assert initial_state is None
             y, _ = cell(x, initial_state=(input_h, input_c))
         if self._direction == -1:
-            y = tf_compat.v1.reverse_sequence(y, seq_lengths=seq_len, batch_dim=1, seq_dim=0)
+            y = tf_util.reverse_sequence_time_major(y, seq_len)
         y, _ = self._post_proc_output_cell_strict(y, in_data=in_data, final_state=None)  # noqa
         return y  # noqa
 
@@ -1202,7 +1213,6 @@ class RecLayer(_ConcatInputLayer):
         :rtype: tf.Tensor
         """
         from returnn.tf.util.basic import (
-            dot,
             sequence_mask_time_major,
             directed,
             to_int32_64,
@@ -1234,17 +1244,21 @@ class RecLayer(_ConcatInputLayer):
                     dtype=tf.float32,
                     initializer=self._fwd_weights_initializer,
                 )
-                if self.input_data.sparse:
-                    x = tf.nn.embedding_lookup(weights, to_int32_64(x))
-                else:
-                    x = dot(x, weights)
                 b = tf_compat.v1.get_variable(
                     name="b", shape=(cell.n_input_dim,), dtype=tf.float32, initializer=self._bias_initializer
                 )
                 if len(cell.n_input_dim_parts) > 1:
                     set_param_axes_split_info(weights, [[self.input_data.dim], cell.n_input_dim_parts])
                     set_param_axes_split_info(b, [cell.n_input_dim_parts])
-                x += b
+                if self.input_data.sparse:
+                    x = tf.nn.embedding_lookup(weights, to_int32_64(x))
+                    x = tf.nn.bias_add(x, b, name="add_bias")
+                else:
+                    # MatMul directly followed by BiasAdd, such that Grappler can fuse it into a single kernel.
+                    x_shape = tf.shape(x)
+                    x = tf.reshape(x, [-1, self.input_data.dim])
+                    x = tf_compat.v1.nn.xw_plus_b(x, weights, b)
+                    x = tf.reshape(x, [x_shape[0], x_shape[1], cell.n_input_dim])
         else:
             assert not cell.does_input_projection
             assert not self.input_data.sparse
@@ -1283,7 +1297,23 @@ class RecLayer(_ConcatInputLayer):
         assert (
             self._last_hidden_state is not None
         ), "last-hidden-state not implemented/supported for this layer-type. try another unit. see the code."
-        return RnnCellLayer.get_state_by_key(self._last_hidden_state, key=key)
+        if key not in self._last_hidden_state_cache:
+            # Cached, as e.g. key "*" would create a new concat each time.
+            self._last_hidden_state_cache[key] = RnnCellLayer.get_state_by_key(self._last_hidden_state, key=key)
+        return self._last_hidden_state_cache[key]
+
+    def get_last_hidden_state_parts(self, key):
+        """
+        :param str|int|None key:
+        :rtype: list[tf.Tensor]
+        """
+        assert (
+            self._last_hidden_state is not None
+        ), "last-hidden-state not implemented/supported for this layer-type. try another unit. see the code."
+        parts = RnnCellLayer.get_state_parts_by_key(self._last_hidden_state, key=key)
+        if parts is None:
+            return [self.get_last_hidden_state(key=key)]
+        return parts
 
     @classmethod
     def is_prev_step_layer(cls, layer):
@@ -1357,11 +1387,12 @@ class _SubnetworkRecCell(object):
         :param returnn.tf.network.TFNetwork parent_net:
         :param ((str) -> LayerBase) parent_get_layer: for template construction
         """
-        from returnn.tf.util.basic import safe_deep_copy
+        from returnn.tf.util.basic import copy_dict_structure
 
         self.parent_rec_layer = None  # type: typing.Optional[RecLayer]
         self.parent_net = parent_net
-        self.net_dict = safe_deep_copy(net_dict)
+        # Only the dict structure is modified later on (layers added, sub layer dicts replaced).
+        self.net_dict = copy_dict_structure(net_dict)
         from returnn.tf.network import TFNetwork, ExternData, LossHolder
         from returnn.tf.util.data import ControlFlowContext
 
@@ -1434,6 +1465,11 @@ class _SubnetworkRecCell(object):
         self._initial_extra_outputs = (
             None
         )  # type: typing.Optional[typing.Dict[str,typing.Dict[str,typing.Union[tf.Tensor,typing.Tuple[tf.Tensor,...]]]]]  # nopep8
+        # Sorted keys of the above, which define the order of the loop vars. Set in get_init_loop_vars.
+        self._initial_outputs_keys = None  # type: typing.Optional[typing.Tuple[str,...]]
+        self._initial_extra_outputs_keys = (
+            None
+        )  # type: typing.Optional[typing.Tuple[typing.Tuple[str,typing.Tuple[str,...]],...]]  # nopep8
 
         # input_layers_moved_out, output_layers_moved_out and layers_in_loop include (used) sub-layers as separate
         # entries, this way in- and outputting them to the loop via TensorArrays will be handled just as for normal
@@ -2339,7 +2375,7 @@ class _SubnetworkRecCell(object):
 
                         return constant_with_shape(False, shape=[batch_dim], name="initial_end")
                     return cl.get_rec_initial_output(
-                        batch_dim=batch_dim, rec_layer=self.parent_rec_layer, **self.layer_data_templates[name].kwargs
+                        batch_dim=batch_dim, rec_layer=self.parent_rec_layer, **template_layer.kwargs
                     )
                 except Exception as exc:
                     self._handle_construct_exception(
@@ -2362,7 +2398,7 @@ class _SubnetworkRecCell(object):
                 try:
                     batch_dim = template_layer.get_batch_dim()
                     d = cl.get_rec_initial_extra_outputs(
-                        batch_dim=batch_dim, rec_layer=self.parent_rec_layer, **self.layer_data_templates[name].kwargs
+                        batch_dim=batch_dim, rec_layer=self.parent_rec_layer, **template_layer.kwargs
                     )
                 except Exception as exc:
                     self._handle_construct_exception(
@@ -2385,21 +2421,25 @@ class _SubnetworkRecCell(object):
         :return: initial loop_vars. see self.get_next_loop_vars(). used in the body inside self.get_output()
         :rtype: (list[tf.Tensor],list[list[tf.Tensor]])
         """
+        layers_moved_out = set(self.input_layers_moved_out + self.output_layers_moved_out)
         self._initial_outputs = {
-            k: self._get_init_output(k)
-            for k in sorted(self.prev_layers_needed)
-            if k not in self.input_layers_moved_out + self.output_layers_moved_out
+            k: self._get_init_output(k) for k in sorted(self.prev_layers_needed) if k not in layers_moved_out
         }
         self._initial_extra_outputs = {
             k: self._get_init_extra_outputs(k)
             for k in sorted(self.layer_data_templates.keys())
-            if k not in self.input_layers_moved_out + self.output_layers_moved_out
+            if k not in layers_moved_out
         }
         self._initial_extra_outputs = {k: v for (k, v) in self._initial_extra_outputs.items() if v}
-        from returnn.util.basic import sorted_values_from_dict
+        self._initial_outputs_keys = tuple(sorted(self._initial_outputs))
+        self._initial_extra_outputs_keys = tuple(
+            (k, tuple(sorted(v))) for (k, v) in sorted(self._initial_extra_outputs.items())
+        )
 
-        init_outputs_flat = sorted_values_from_dict(self._initial_outputs)
-        init_extra_flat = [sorted_values_from_dict(v) for (k, v) in sorted(self._initial_extra_outputs.items())]
+        init_outputs_flat = [self._initial_outputs[k] for k in self._initial_outputs_keys]
+        init_extra_flat = [
+            [self._initial_extra_outputs[k][k_] for k_ in keys] for (k, keys) in self._initial_extra_outputs_keys
+        ]
         return init_outputs_flat, init_extra_flat
 
     def get_init_loop_vars_shape_invariants(self):
@@ -2420,7 +2460,7 @@ class _SubnetworkRecCell(object):
             template_layer = self.layer_data_templates[name]
             cl = template_layer.layer_class_type
             d = cl.get_rec_initial_extra_outputs_shape_invariants(
-                rec_layer=self.parent_rec_layer, **self.layer_data_templates[name].kwargs
+                rec_layer=self.parent_rec_layer, **template_layer.kwargs
             )
             for k, shape in d.items():
                 assert k in shapes
@@ -2446,10 +2486,7 @@ class _SubnetworkRecCell(object):
         assert len(prev_extra_flat) == len(self._initial_extra_outputs)
         from returnn.util.basic import dict_zip
 
-        prev_extra = {
-            k: dict_zip(sorted(self._initial_extra_outputs[k]), v)
-            for (k, v) in zip(sorted(self._initial_extra_outputs), prev_extra_flat)
-        }
+        prev_extra = {k: dict_zip(keys, v) for ((k, keys), v) in zip(self._initial_extra_outputs_keys, prev_extra_flat)}
         rec_vars_outputs = prev_extra[layer_name]
         if final_frame:
             if layer_name in self.net.layers:
@@ -2465,7 +2502,7 @@ class _SubnetworkRecCell(object):
         final_outputs_flat, final_extra_flat = loop_vars
         assert len(final_outputs_flat) == len(self._initial_outputs)
         assert len(final_extra_flat) == len(self._initial_extra_outputs)
-        for k, v in zip(sorted(self._initial_outputs), final_outputs_flat):
+        for k, v in zip(self._initial_outputs_keys, final_outputs_flat):
             layer_template = self.layer_data_templates[k]
             if not layer_template.need_last:
                 continue
@@ -2731,6 +2768,8 @@ class _SubnetworkRecCell(object):
         # the input ('source') and the target,
         # but maybe also other additional extern data that is used inside the subnet.
         data_tensor_arrays = {}  # dict[str,tf.TensorArray]
+        # Extern data does not need gradients, so we do not need a TensorArray for it but can index it directly.
+        data_time_major = {}  # dict[str,tf.Tensor]
 
         time_dim_tag = None
         with tf.name_scope("subnet_base"):
@@ -2887,15 +2926,8 @@ class _SubnetworkRecCell(object):
                             ]
                         ):
                             data_len = tf.identity(data_len)
-                data_ta = tf.TensorArray(
-                    name=key + "_ta",
-                    dtype=data.dtype,
-                    element_shape=tf.TensorShape(data.copy_template_excluding_time_dim().batch_shape),
-                    size=data_len,
-                    infer_shape=True,
-                )
-                data_ta = data_ta.unstack(data_placeholder, name="{}_ta_unstack".format(key))
-                data_tensor_arrays[key] = data_ta
+                with tf.control_dependencies([data_len]):  # length checks
+                    data_time_major[key] = tf.identity(data_placeholder, name="%s_time_major" % key)
                 if max_seq_len is None:
                     max_seq_len = common_data_len
 
@@ -3204,7 +3236,8 @@ class _SubnetworkRecCell(object):
                     dtype=out.dtype,
                     element_shape=tf.TensorShape(out.element_shape),
                     size=min_loop_len,
-                    dynamic_size=True,  # we will automatically grow it when needed
+                    # With known seq len, this is the final size. Otherwise, we will automatically grow it when needed.
+                    dynamic_size=not have_known_seq_len,
                     clear_after_read=not out.name.startswith("choice_"),
                     infer_shape=out.same_shape_every_frame,
                 )
@@ -3249,21 +3282,21 @@ class _SubnetworkRecCell(object):
                 self.net.set_rec_step_info(**rec_step_info)
                 # get next loop vars (net_vars)
                 from returnn.tf.util.basic import identity_op_nested
-                from returnn.util.basic import sorted_values_from_dict, dict_zip
+                from returnn.util.basic import dict_zip
 
                 prev_outputs_flat, prev_extra_flat = net_vars
                 assert len(prev_outputs_flat) == len(self._initial_outputs)  # subset of self.prev_layers_needed
-                prev_outputs = {k: v for (k, v) in zip(sorted(self._initial_outputs), prev_outputs_flat)}
+                prev_outputs = {k: v for (k, v) in zip(self._initial_outputs_keys, prev_outputs_flat)}
                 with tf.name_scope("prev_outputs"):
                     prev_outputs = identity_op_nested(prev_outputs)
                 assert len(prev_extra_flat) == len(self._initial_extra_outputs)
                 prev_extra = {
-                    k: dict_zip(sorted(self._initial_extra_outputs[k]), v)
-                    for (k, v) in zip(sorted(self._initial_extra_outputs), prev_extra_flat)
+                    k: dict_zip(keys, v) for ((k, keys), v) in zip(self._initial_extra_outputs_keys, prev_extra_flat)
                 }
                 with tf.name_scope("prev_extra"):
                     prev_extra = identity_op_nested(prev_extra)
                 data_ = {key_: ta.read(i, name="{}_ta_read".format(key_)) for key_, ta in data_tensor_arrays.items()}
+                data_.update({key_: x[i] for key_, x in data_time_major.items()})
                 # noinspection PyProtectedMember
                 with reuse_name_scope(self.parent_rec_layer._rec_scope):
                     self._construct(
@@ -3311,7 +3344,7 @@ class _SubnetworkRecCell(object):
                     return transformed_layer
 
                 # Handle need_last.
-                for k in sorted(self._initial_outputs):
+                for k in self._initial_outputs_keys:
                     layer = self.net.layers[k]
                     if not layer.need_last:
                         continue
@@ -3379,13 +3412,13 @@ class _SubnetworkRecCell(object):
                     maybe_transform(self.net.layers[k])
                     .output.copy_compatible_to(self.layer_data_templates[k].output)
                     .placeholder
-                    for k in sorted(self._initial_outputs)
+                    for k in self._initial_outputs_keys
                 ]
                 extra_flat = []
-                for k, v in sorted(self._initial_extra_outputs.items()):
+                for k, keys in self._initial_extra_outputs_keys:
                     layer = maybe_transform(self.net.layers[k])
-                    assert set(layer.rec_vars_outputs.keys()) == set(v.keys())
-                    extra_flat.append(sorted_values_from_dict(layer.rec_vars_outputs))
+                    assert set(layer.rec_vars_outputs.keys()) == set(keys)
+                    extra_flat.append([layer.rec_vars_outputs[k_] for k_ in keys])
                 net_vars = (outputs_flat, extra_flat)
 
                 assert len(acc_tas) == len(outputs_to_accumulate)
@@ -4615,7 +4648,9 @@ class _TemplateLayer(LayerBase):
         layer.output.name = "prev:%s" % layer.output.name
         if prev_output is not None:
             layer.output.placeholder = prev_output
-            layer.output.placeholder.set_shape(tf.TensorShape(layer.output.batch_shape))
+            shape = tf.TensorShape(layer.output.batch_shape)
+            if prev_output.shape != shape:  # usually already the same via the loop vars shape invariants
+                prev_output.set_shape(shape)
             assert layer.output.placeholder.dtype is tf.as_dtype(layer.output.dtype)
         if rec_vars_prev_outputs is not None:
             layer.rec_vars_outputs = rec_vars_prev_outputs
@@ -4816,6 +4851,17 @@ class _TemplateLayer(LayerBase):
             return RnnCellLayer.get_state_by_key(self.rec_vars_outputs["state"], key=key)
         return super(_TemplateLayer, self).get_last_hidden_state(key=key)
 
+    def get_last_hidden_state_parts(self, key):
+        """
+        :param int|str|None key: also the special key "*"
+        :rtype: list[tf.Tensor] | None
+        """
+        if issubclass(self.layer_class_type, RnnCellLayer):
+            parts = RnnCellLayer.get_state_parts_by_key(self.rec_vars_outputs["state"], key=key)
+            if parts is not None:
+                return parts
+        return super(_TemplateLayer, self).get_last_hidden_state_parts(key=key)
+
 
 class _SubnetworkRecWrappedLoss(Loss):
     """
@@ -5300,18 +5346,21 @@ class RnnCellLayer(_ConcatInputLayer):
         from tensorflow.python.util import nest
         from returnn.util.basic import is_namedtuple
 
+        is_nested = getattr(nest, "is_nested", None) or nest.is_sequence  # is_sequence was removed in newer TF
         if key == "*":
-            if nest.is_sequence(state):
-                x = tf.concat(state, axis=-1)  # in dim-axis
+            if is_nested(state):
+                with tf_util.same_control_flow_ctx(nest.flatten(state)):
+                    x = tf.concat(state, axis=-1)  # in dim-axis
             else:
                 x = state
         elif key == "flat":
-            assert nest.is_sequence(state), "only a sequence can be flattened, but got %r" % (state,)
-            x = tf.concat(state, axis=-1)  # in dim-axis
+            assert is_nested(state), "only a sequence can be flattened, but got %r" % (state,)
+            with tf_util.same_control_flow_ctx(nest.flatten(state)):
+                x = tf.concat(state, axis=-1)  # in dim-axis
         elif is_namedtuple(type(state)):
             assert isinstance(key, str), "state %r is a named tuple, thus key %r must be a string" % (state, key)
             x = getattr(state, key)
-        elif nest.is_sequence(state):
+        elif is_nested(state):
             assert isinstance(key, int), "state %r is a tuple, thus key %r must be an int" % (state, key)
             x = state[key]
         else:
@@ -5325,12 +5374,45 @@ class RnnCellLayer(_ConcatInputLayer):
             x.set_shape(tf.TensorShape([None] * len(shape)))
         return x
 
+    @classmethod
+    def get_state_parts_by_key(cls, state, key):
+        """
+        For the keys "*" and "flat" on a state tuple, :func:`get_state_by_key` concatenates the state parts.
+        This returns these parts instead.
+
+        :param tf.Tensor|tuple[tf.Tensor]|namedtuple state:
+        :param int|str|None key:
+        :return: the parts, or None if the state for this key is not a concatenation
+        :rtype: list[tf.Tensor]|None
+        """
+        from tensorflow.python.util import nest
+
+        is_nested = getattr(nest, "is_nested", None) or nest.is_sequence  # is_sequence was removed in newer TF
+        if key not in ("*", "flat") or not is_nested(state):
+            return None
+        if not all(isinstance(x, tf.Tensor) for x in state):
+            return None
+        return list(state)
+
     def get_last_hidden_state(self, key):
         """
         :param int|str|None key:
         :rtype: tf.Tensor
         """
-        return self.get_state_by_key(self._hidden_state, key=key)
+        if key not in self._last_hidden_state_cache:
+            # Cached, as e.g. key "*" would create a new concat each time.
+            self._last_hidden_state_cache[key] = self.get_state_by_key(self._hidden_state, key=key)
+        return self._last_hidden_state_cache[key]
+
+    def get_last_hidden_state_parts(self, key):
+        """
+        :param int|str|None key:
+        :rtype: list[tf.Tensor]
+        """
+        parts = self.get_state_parts_by_key(self._hidden_state, key=key)
+        if parts is None:
+            return [self.get_last_hidden_state(key=key)]
+        return parts
 
     @classmethod
     def get_rec_initial_state(
@@ -5701,7 +5783,12 @@ class GetLastHiddenStateLayer(LayerBase):
             h = last_states[0]
         else:
             if combine == "concat":
-                h = tf.concat(last_states, axis=-1, name="concat_hidden_states")
+                # The states can be concatenated state tuples themselves (e.g. LSTM (c,h) with key "*").
+                # Concat all the parts directly, such that we do not copy them twice.
+                parts = []
+                for src in self.sources:
+                    parts.extend(src.get_last_hidden_state_parts(key=key))
+                h = tf.concat(parts, axis=-1, name="concat_hidden_states")
             elif combine == "add":
                 h = tf.add_n(last_states, name="add_hidden_states")
             else:
@@ -7612,22 +7699,19 @@ class DotAttentionLayer(GlobalAttentionContextBaseLayer):
             base = self.base.output.get_placeholder_as_batch_major()  # (batch, base_time, n_out)
             base_seq_lens = self.base.output.get_sequence_lengths()
             base_ctx = self.base_ctx.output.get_placeholder_as_batch_major()  # (batch, base_time, inner)
-            # Get source of shape (batch, inner, 1).
-            source = tf.expand_dims(self.input_data.placeholder, axis=2)  # (batch, inner, 1)
-            energy = tf.matmul(base_ctx, source)  # (batch, base_time, 1)
-            energy.set_shape(tf.TensorShape([None, None, 1]))
-            energy = tf.squeeze(energy, axis=2)  # (batch, base_time)
+            source = self.input_data.placeholder  # (batch, inner)
+            energy = tf.einsum("bti,bi->bt", base_ctx, source)  # (batch, base_time)
             if energy_factor:
                 energy *= energy_factor
             # We must mask all values behind base_seq_lens. Set them to -inf, because we use softmax afterwards.
             energy_mask = tf.sequence_mask(base_seq_lens, maxlen=tf.shape(energy)[1])
             inf_value = self.network.get_config().typed_value("inf_value", float("inf"))
-            energy = tf.where(energy_mask, energy, -inf_value * tf.ones_like(energy))
-            self.base_weights = tf.nn.softmax(energy)  # (batch, base_time)
-            base_weights_bc = tf.expand_dims(self.base_weights, axis=1)  # (batch, 1, base_time)
-            out = tf.matmul(base_weights_bc, base)  # (batch, 1, n_out)
-            out.set_shape(tf.TensorShape([None, 1, self.output.dim]))
-            out = tf.squeeze(out, axis=1)  # (batch, n_out)
+            with self.xla_jit_scope():  # XLA can fuse the masking, softmax and weighted sum
+                # Broadcast the scalar, no need to create a full (batch, base_time) tensor for it.
+                energy = tf_util.where_bc(energy_mask, energy, tf.constant(-inf_value, dtype=energy.dtype))
+                self.base_weights = tf.nn.softmax(energy)  # (batch, base_time)
+                out = tf.einsum("bt,btn->bn", self.base_weights, base)  # (batch, n_out)
+                out.set_shape(tf.TensorShape([None, self.output.dim]))
             self.output.placeholder = out
             self.output.size_placeholder = {}
 
@@ -7669,12 +7753,12 @@ class ConcatAttentionLayer(GlobalAttentionContextBaseLayer):
             # We must mask all values behind base_seq_lens. Set them to -inf, because we use softmax afterwards.
             energy_mask = tf.sequence_mask(base_seq_lens, maxlen=tf.shape(energy)[1])
             inf_value = self.network.get_config().typed_value("inf_value", float("inf"))
-            energy = tf.where(energy_mask, energy, -inf_value * tf.ones_like(energy))
-            self.base_weights = tf.nn.softmax(energy)  # (batch, base_time)
-            base_weights_bc = tf.expand_dims(self.base_weights, axis=1)  # (batch, 1, base_time)
-            out = tf.matmul(base_weights_bc, base)  # (batch, 1, n_out)
-            out.set_shape(tf.TensorShape([None, 1, self.output.dim]))
-            out = tf.squeeze(out, axis=1)  # (batch, n_out)
+            with self.xla_jit_scope():  # XLA can fuse the masking, softmax and weighted sum
+                # Broadcast the scalar, no need to create a full (batch, base_time) tensor for it.
+                energy = tf_util.where_bc(energy_mask, energy, tf.constant(-inf_value, dtype=energy.dtype))
+                self.base_weights = tf.nn.softmax(energy)  # (batch, base_time)
+                out = tf.einsum("bt,btn->bn", self.base_weights, base)  # (batch, n_out)
+                out.set_shape(tf.TensorShape([None, self.output.dim]))
             self.output.placeholder = out
             self.output.size_placeholder = {}
 
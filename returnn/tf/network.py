@@ -2239,12 +2239,14 @@ class TFNetwork(object):
         :rtype: list[tf.Variable]
         """
         ls = []  # type: typing.List[tf.Variable]
+        visited = set()  # type: typing.Set[tf.Variable]  # hashed by id, faster than `param in ls`
         for layer in self.get_all_layers_deep():
             assert isinstance(layer, LayerBase)
             for param_name, param in sorted(layer.params.items()):
                 assert isinstance(param, tf.Variable)
-                if param in ls:  # could happen with reuse_params
+                if param in visited:  # could happen with reuse_params
                     continue
+                visited.add(param)
                 ls.append(param)
         return ls
 
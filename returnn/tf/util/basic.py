@@ -1685,7 +1685,6 @@ def get_initializer(s, seed=None, eval_local_ns=None, dtype=tf.float32):
         return tf_compat.v1.zeros_initializer(dtype=dtype)
     if not s and dtype.is_integer:
         return tf_compat.v1.zeros_initializer(dtype=dtype)
-    import math
     from tensorflow.python.ops import init_ops
 
     def error():
@@ -1700,21 +1699,12 @@ def get_initializer(s, seed=None, eval_local_ns=None, dtype=tf.float32):
             if isclass(value) and issubclass(value, init_ops.Initializer):
                 print("  %s" % key)
 
-    ns = dict(globals())
-    ns.update(vars(tf_compat.v1))
-    ns.update(vars(init_ops))
-    ns.update(vars(math))
-    ns["numpy"] = numpy
-    for k in sorted(list(ns.keys())):
-        if k.endswith("_initializer"):
-            k_short = k[: -len("_initializer")]
-            if k_short not in ns:
-                ns[k_short] = ns[k]
+    ns = _get_initializer_namespace()
     f = None
     try:
         if isinstance(s, str):
             if "(" in s:
-                f = eval(s, ns, eval_local_ns)
+                f = eval(_get_initializer_expr_code(s), ns, eval_local_ns)
             elif s + "_initializer" in ns:
                 f = ns[s + "_initializer"]()
             elif s in ns:
@@ -1750,6 +1740,53 @@ def get_initializer(s, seed=None, eval_local_ns=None, dtype=tf.float32):
     return f
 
 
+_initializer_namespace = None  # type: typing.Optional[typing.Dict[str,typing.Any]]
+
+
+def _get_initializer_namespace():
+    """
+    :return: namespace for :func:`get_initializer`.
+      Cached, as it is relatively expensive to build, and get_initializer is called for every param.
+    :rtype: dict[str]
+    """
+    global _initializer_namespace
+    if _initializer_namespace is not None:
+        return _initializer_namespace
+    import math
+    import numpy
+    from tensorflow.python.ops import init_ops
+
+    ns = dict(globals())
+    ns.update(vars(tf_compat.v1))
+    ns.update(vars(init_ops))
+    ns.update(vars(math))
+    ns["numpy"] = numpy
+    for k in sorted(list(ns.keys())):
+        if k.endswith("_initializer"):
+            k_short = k[: -len("_initializer")]
+            if k_short not in ns:
+                ns[k_short] = ns[k]
+    _initializer_namespace = ns
+    return ns
+
+
+_initializer_expr_code_cache = {}  # type: typing.Dict[str,typing.Any]
+
+
+def _get_initializer_expr_code(s):
+    """
+    :param str s: initializer expression, e.g. "variance_scaling_initializer(scale=0.78)"
+    :return: compiled code object for :func:`get_initializer`.
+      Cached, as the same few expressions are evaluated again for every param of every layer.
+    :rtype: types.CodeType
+    """
+    code = _initializer_expr_code_cache.get(s)
+    if code is None:
+        code = compile(s, "<initializer>", "eval")
+        _initializer_expr_code_cache[s] = code
+    return code
+
+
 def dropout(
     x,
     keep_prob,
@@ -2012,6 +2049,25 @@ class TensorCachedComputation:
         self._get_cache_dict()[self.key] = value
 
 
+def argmax_last_axis(x):
+    """
+    Like tf.argmax(x, axis=-1) with int32 output.
+    It will cache the value inside the passed object so that we don't recompute it multiple times,
+    e.g. for the frame error of multiple losses on the same (flattened) output.
+
+    :param tf.Tensor x: shape (...,dim)
+    :return: shape (...), int32
+    :rtype: tf.Tensor
+    """
+    cache = TensorCachedComputation(x, key="argmax_last_axis")
+    if cache.has_cache():
+        return cache.get_cache()
+    with same_control_flow_ctx(x), reuse_name_scope_of_tensor(x):
+        res = tf.argmax(x, axis=-1, output_type=tf.int32, name="argmax_last_axis")
+    cache.set_cache(res)
+    return res
+
+
 def sequence_mask(lengths, name=None, **kwargs):
     """
     Wraps around tf.sequence_mask().
@@ -2094,6 +2150,26 @@ def reversed(x):
     return y
 
 
+def reverse_sequence_time_major(x, seq_len):
+    """
+    Like ``tf.reverse_sequence(x, seq_lengths=seq_len, batch_dim=1, seq_dim=0)``.
+    As this is an involution, it will cache the inverse inside the result,
+    such that reversing the result again (e.g. stacked backward RNNs) directly returns x
+    instead of another full pass over the sequence.
+
+    :param tf.Tensor x: (time,batch,...)
+    :param tf.Tensor seq_len: (batch,)
+    :rtype: tf.Tensor
+    """
+    cache_x = TensorCachedComputation(x, key=("reverse_sequence_time_major", seq_len))
+    if cache_x.has_cache():
+        return cache_x.get_cache()
+    y = tf_compat.v1.reverse_sequence(x, seq_lengths=seq_len, batch_dim=1, seq_dim=0)
+    cache_x.set_cache(y)
+    TensorCachedComputation(y, key=("reverse_sequence_time_major", seq_len)).set_cache(x)
+    return y
+
+
 def get_flatten_with_seq_len_mask_cache_for_data(x):
     """
     :param Data x:
@@ -2379,18 +2455,15 @@ def sparse_labels_with_seq_lens(x, seq_lens, dtype=tf.int32, collapse_repeated=F
         with tf.name_scope("flat_x"):
             flat_x = tf.boolean_mask(x, mask)  # (N, ...s...)
         with tf.name_scope("idxs"):
+            # tf.SparseTensor requires int64 indices. tf.where gives them in the same order as tf.boolean_mask.
+            flat_idxs = tf.where(mask)  # shape (N, 2), (batch,time)
             if collapse_repeated or post_filter_idx is not None:
-                # Recalculate mask, so that we have them all behind each other.
-                seq_lens = tf.reduce_sum(tf.cast(mask, tf.int32), axis=1)  # (batch,)
+                # Move the remaining entries behind each other, i.e. the new time idx is the count of previous ones.
+                mask_int = tf.cast(mask, tf.int32)
+                seq_lens = tf.reduce_sum(mask_int, axis=1)  # (batch,)
                 max_time = tf.reduce_max(seq_lens)
-                mask = sequence_mask(seq_lens)
-            time_idxs = expand_dims_unbroadcast(tf.range(max_time), 0, batch_size)  # shape (batch,time)
-            flat_time_idxs = tf.boolean_mask(time_idxs, mask)  # (N,)
-            batch_idxs = expand_dims_unbroadcast(tf.range(batch_size), 1, max_time)  # shape (batch,time)
-            flat_batch_idxs = tf.boolean_mask(batch_idxs, mask)  # (N,)
-            flat_idxs = tf.stack([flat_batch_idxs, flat_time_idxs], axis=1)  # shape (N, 2)
-            # tf.SparseTensor requires int64 indices
-            flat_idxs = tf.cast(flat_idxs, tf.int64)
+                new_time_idxs = tf.boolean_mask(tf.cumsum(mask_int, axis=1, exclusive=True), mask)  # (N,)
+                flat_idxs = tf.stack([flat_idxs[:, 0], tf.cast(new_time_idxs, tf.int64)], axis=1)  # (N, 2)
         with tf.name_scope("shape"):
             shape = [batch_size, max_time]
             # tf.SparseTensor requires int64 shape
@@ -5111,9 +5184,47 @@ def simplify_non_negative_seq_length(x):
     if isinstance(x, (int, float, numpy.ndarray)):
         return max(x, 0)
     assert isinstance(x, tf.Tensor)
+    from tensorflow.python.framework import tensor_util
+
+    # Chains like max(max(z, 0) - c, 0) (e.g. from a slice on a slice) can be simplified to max(z - c, 0) for c >= 0,
+    # and then z - c can maybe also be simplified further.
+    offset = _get_non_positive_const_offset(x)
+    if offset is not None:
+        y, c = offset
+        if y.op.type == "Maximum" and y.dtype == tf.int32:
+            y_inputs = list(y.op.inputs)
+            for i, y_in in enumerate(y_inputs):
+                y_in_ = tensor_util.constant_value(y_in)
+                if y_in_ is not None and y_in_.ndim == 0 and y_in_ == 0:
+                    return tf.maximum(simplify_add(y_inputs[1 - i], c), 0)
     return tf.maximum(x, 0)
 
 
+def _get_non_positive_const_offset(x):
+    """
+    :param tf.Tensor x:
+    :return: (y, c) such that x == y + c, where c <= 0 is a constant scalar, or None if x is not of that form
+    :rtype: (tf.Tensor, numpy.ndarray)|None
+    """
+    from tensorflow.python.framework import tensor_util
+
+    if x.op.type in {"Add", "AddV2"}:
+        a, b = x.op.inputs
+        if tensor_util.constant_value(a) is not None:
+            a, b = b, a
+        c = tensor_util.constant_value(b)
+    elif x.op.type == "Sub":
+        a, b = x.op.inputs
+        c = tensor_util.constant_value(b)
+        if c is not None:
+            c = -c
+    else:
+        return None
+    if c is None or c.ndim != 0 or c > 0:
+        return None
+    return a, c
+
+
 def copy_tensor(x):
     """
     Similar to tf.identity, but we ensure here that the return value has its own memory.
@@ -6437,14 +6548,16 @@ def to_float32(x):
 def batch_gather(x, indices, keepdims=False):
     """
     :param tf.Tensor x: (batch,dim,...)
-    :param tf.Tensor indices: (batch,) -> [0..dim-1]
+    :param tf.Tensor indices: (batch,) or (batch,I...) -> [0..dim-1]
     :param bool keepdims:
-    :return: x[batches,indices[batches]], (batch,...). or (batch,1,...) with keep_dims
+    :return: x[batches,indices[batches]], (batch,[I...],...). or (batch,1,...) with keep_dims
     :rtype: tf.Tensor
     """
     with tf.name_scope("batch_gather"):
-        idx_ext = nd_indices(to_int32_64(indices))
-        y = tf.gather_nd(x, indices=idx_ext)
+        # This avoids creating the (batch,2) nd indices for tf.gather_nd.
+        # Indices are per batch entry, so there is no batch*dim flat index which could overflow,
+        # and out-of-range indices are still checked (on CPU).
+        y = tf.gather(x, to_int32_64(indices), axis=1, batch_dims=1)
         if keepdims:
             y = tf.expand_dims(y, axis=1)
         return y
@@ -6750,6 +6863,69 @@ def var_handle_or_ref(var):
     raise TypeError("invalid type for var %r" % var)
 
 
+def assign_moving_average(var, value, momentum):
+    """
+    Exponential moving average update, ``var += (value - var) * momentum``.
+    This is done as ``var -= momentum * (var - value)`` via the ApplyGradientDescent kernel,
+    which does the scaling and the update in-place in a single op.
+
+    :param tf.Variable var:
+    :param tf.Tensor value: same shape as var
+    :param float|tf.Tensor momentum:
+    :return: updated var value. depends on the update op
+    :rtype: tf.Tensor
+    """
+    from tensorflow.python.ops.resource_variable_ops import ResourceVariable
+
+    with tf.name_scope("assign_moving_average"):
+        alpha = tf.cast(momentum, var.dtype.base_dtype)
+        delta = tf.subtract(var, value, name="delta")
+        if isinstance(var, ResourceVariable):
+            op = tf.raw_ops.ResourceApplyGradientDescent(var=var.handle, alpha=alpha, delta=delta)
+            with tf.control_dependencies([op]):
+                return var.read_value()
+        return tf.raw_ops.ApplyGradientDescent(var=var_handle_or_ref(var), alpha=alpha, delta=delta)
+
+
+def fused_moments(x, axis):
+    """
+    Like ``tf.nn.moments`` over all axes except `axis`,
+    but via the fused batch norm kernel, which does a single pass over `x`
+    instead of two (first mean, then variance).
+    Note that the fused kernel does not propagate gradients through the moments,
+    so only use this when no gradient is needed, e.g. for the running average in batch norm.
+
+    :param tf.Tensor x: float16 or float32
+    :param int axis: the (feature) axis which is kept
+    :return: mean, variance (biased, like ``tf.nn.moments``), each of shape [x.shape[axis]]
+    :rtype: (tf.Tensor, tf.Tensor)
+    """
+    from returnn.util.basic import prod
+
+    with tf.name_scope("fused_moments"):
+        x_shape = get_shape(x)
+        if axis < 0:
+            axis += len(x_shape)
+        dim = x_shape[axis]
+        if axis == len(x_shape) - 1:
+            data_format = "NHWC"
+            x_ = tf.reshape(x, [-1, 1, 1, dim])
+        else:
+            data_format = "NCHW"
+            x_ = tf.reshape(x, [prod(x_shape[:axis]), dim, prod(x_shape[axis + 1 :]), 1])
+        _, mean, variance = tf_compat.v1.nn.fused_batch_norm(
+            x_,
+            scale=tf.ones([dim], dtype=tf.float32),
+            offset=tf.zeros([dim], dtype=tf.float32),
+            data_format=data_format,
+            is_training=True,
+        )
+        # The fused kernel returns the unbiased variance (with Bessel's correction).
+        n = tf.cast(prod(x_shape[:axis] + x_shape[axis + 1 :]), variance.dtype)
+        variance *= tf.maximum(n - 1.0, 0.0) / n
+        return tf.cast(mean, x.dtype), tf.cast(variance, x.dtype)
+
+
 def find_ops_with_tensor_input(tensors, fetches=None, graph=None):
     """
     :param tf.Tensor|tf.Variable|list[tf.Tensor] tensors:
@@ -7583,6 +7759,23 @@ def safe_deep_copy(obj):
     return deepcopy(obj, stop_types=stop_types)
 
 
+def copy_dict_structure(obj):
+    """
+    Copies only the nested dict/list containers (e.g. of a net dict), and keeps references to all other objects.
+    This is much cheaper than :func:`safe_deep_copy`,
+    and sufficient when only the containers are modified later (e.g. layers added or layer opts replaced).
+
+    :param T obj:
+    :return: copy of obj, where all nested dicts and lists are new objects
+    :rtype: T
+    """
+    if isinstance(obj, dict):
+        return {key: copy_dict_structure(value) for (key, value) in obj.items()}
+    if isinstance(obj, list):
+        return [copy_dict_structure(value) for value in obj]
+    return obj
+
+
 class FetchHelper:
     """
     ``session.run(tensor)`` does not work if ``tensor`` is inside a loop (``tf.while_loop``) (or ``tf.cond``).
@@ -9,7 +9,6 @@ import sys
 from typing import Dict
 import time
 from datetime import datetime
-from collections import defaultdict
 import multiprocessing
 import psutil  # noqa
 
@@ -30,6 +29,12 @@ def watch_memory():
 _watch_memory_proc = None
 
 
+# Polling interval for the memory usage of the known procs.
+_PollInterval = 5
+# Enumerating all (recursive) children is more expensive, so do this less often.
+_ChildrenUpdateInterval = 30
+
+
 def _watch_memory_main(pid: int):
     if sys.platform == "linux":
         with open("/proc/self/comm", "w") as f:
@@ -42,16 +47,19 @@ def _watch_memory_main(pid: int):
     cur_proc = psutil.Process(pid)
     procs = []
     mem_per_pid = {}
+    last_children_update_time = None
 
     while True:
         change = False
-        procs_ = [cur_proc] + cur_proc.children(recursive=True)
-        for p in procs:
-            if p not in procs_:
-                _print(f"proc {_format_proc(p)} exited, old:", _format_mem_info(mem_per_pid[p.pid]))
-                mem_per_pid.pop(p.pid, None)
-                change = True
-        procs = procs_
+        if last_children_update_time is None or time.time() - last_children_update_time >= _ChildrenUpdateInterval:
+            last_children_update_time = time.time()
+            procs_ = [cur_proc] + cur_proc.children(recursive=True)
+            for p in procs:
+                if p not in procs_:
+                    _print(f"proc {_format_proc(p)} exited, old:", _format_mem_info(mem_per_pid[p.pid]))
+                    mem_per_pid.pop(p.pid, None)
+                    change = True
+            procs = procs_
 
         for p in list(procs):
             old_mem_info = mem_per_pid.get(p.pid, None)
@@ -88,7 +96,7 @@ def _watch_memory_main(pid: int):
                 _format_mem_info(res),
             )
 
-        time.sleep(5)
+        time.sleep(_PollInterval)
 
 
 def _format_proc(proc: psutil.Process) -> str:
@@ -111,24 +119,20 @@ def _format_mem_size(c: int) -> str:
     if c < 1024:
         return "%iB" % c
     units = "KMG"
-    i = 0
-    while i < len(units) - 1:
-        if c < 0.8 * 1024 ** (i + 2):
-            break
+    i = min((c.bit_length() - 1) // 10 - 1, len(units) - 1)  # c >= 1024 ** (i + 1)
+    if i < len(units) - 1 and c * 5 >= 4 << (10 * (i + 2)):  # c >= 0.8 * 1024 ** (i + 2)
         i += 1
-    f = float(c) / (1024 ** (i + 1))
-    return "%.1f%sB" % (f, units[i])
+    return "%.1f%sB" % (c / (1 << (10 * (i + 1))), units[i])
 
 
 def get_mem_info(proc: psutil.Process) -> Dict[str, int]:
     """
-    Code from:
+    Idea from:
     https://ppwwyyxx.com/blog/2022/Demystify-RAM-Usage-in-Multiprocess-DataLoader/
+
+    :func:`psutil.Process.memory_full_info` gives us the same PSS/USS
+    but via the kernel-aggregated ``/proc/<pid>/smaps_rollup`` (if available),
+    instead of iterating over all memory maps, which can be many for big mmapped datasets.
     """
-    res = defaultdict(int)
-    for mmap in proc.memory_maps():
-        res["rss"] += mmap.rss
-        res["pss"] += mmap.pss
-        res["uss"] += mmap.private_clean + mmap.private_dirty
-        res["shared"] += mmap.shared_clean + mmap.shared_dirty
-    return res
+    mem = proc.memory_full_info()
+    return {"rss": mem.rss, "pss": mem.pss, "uss": mem.uss, "shared": mem.shared}
@@ -155,6 +155,30 @@ def test_func():
     assert_equal(test_func(), 0)
 
 
+def test_config_parse_cmd_args_multiple():
+    config1 = Config()
+    config1.parse_cmd_args(["--task", "train", "++foo", "1"])
+    config2 = Config()
+    config2.parse_cmd_args(["-n", "5"])
+    assert_equal(config1.value("task", None), "train")
+    assert_equal(config1.int("foo", None), 1)
+    assert_false(config1.has("num_epochs"))
+    assert_equal(config2.int("num_epochs", None), 5)
+    assert_false(config2.has("task"))
+    assert_false(config2.has("foo"))
+
+
+def test_config_load_file_not_found():
+    config = Config()
+    try:
+        config.load_file("/nonexistent/returnn-test-config.py")
+    except AssertionError as exc:
+        assert "config file not found" in str(exc)
+    else:
+        assert False, "expected AssertionError"
+    assert_equal(config.files, [])
+
+
 def test_config_py_ext():
     import tempfile
 
@@ -520,6 +520,17 @@ def test_rnn_getCacheByteSizes_zero():
     assert all([s == 0 for s in sizes])
 
 
+def test_rnn_getCacheByteSizes_units():
+    from returnn.config import Config
+
+    config = Config({"cache_size": ["1.5G", "512M"]})
+    import returnn.__main__ as rnn
+
+    rnn.config = config
+    sizes = rnn.get_cache_byte_sizes()
+    assert sizes == [int(1.5 * 1024**3) + 1, 512 * 1024**2 + 1, 0]
+
+
 def test_rnn_initData():
     hdf_fn = generate_hdf_from_dummy()
     from returnn.config import Config
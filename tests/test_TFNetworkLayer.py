@@ -5,6 +5,7 @@ import _setup_test_env  # noqa
 import tensorflow as tf
 from nose.tools import assert_equal, assert_not_equal, assert_is_instance
 import unittest
+from unittest import mock
 import numpy.testing
 import tempfile
 from pprint import pprint
@@ -152,6 +153,94 @@ def test_LinearLayer():
             session.run(net.get_default_output_layer().output.placeholder, feed_dict=make_feed_dict(net.extern_data))
 
 
+def test_LinearLayer_use_xla():
+    from returnn.tf.util.data import batch_dim
+
+    time_dim = SpatialDim("time")
+    feat_dim = FeatureDim("feature", dimension=5)
+    config = Config({"extern_data": {"data": {"dim_tags": [batch_dim, time_dim, feat_dim]}}, "use_xla": True})
+    with make_scope() as session:
+        net = TFNetwork(config=config)
+        net.construct_from_dict({"output": {"class": "linear", "from": "data", "n_out": 3, "activation": "relu"}})
+        out = net.get_default_output_layer().output.placeholder
+        assert out.op.type == "Relu" and out.op.get_attr("_XlaCompile")
+        assert out.op.inputs[0].op.type == "BiasAdd" and out.op.inputs[0].op.get_attr("_XlaCompile")
+        session.run(tf_compat.v1.global_variables_initializer())
+        v = session.run(out, feed_dict=make_feed_dict(net.extern_data))
+        assert (v >= 0.0).all()
+
+
+def test_ActivationLayer_use_xla_dropout():
+    from returnn.tf.util.data import batch_dim
+
+    time_dim = SpatialDim("time")
+    feat_dim = FeatureDim("feature", dimension=5)
+    config = Config({"extern_data": {"data": {"dim_tags": [batch_dim, time_dim, feat_dim]}}, "use_xla": True})
+    with make_scope() as session:
+        net = TFNetwork(config=config, train_flag=True)
+        net.construct_from_dict(
+            {"output": {"class": "activation", "from": ["data", "data"], "dropout": 0.1, "activation": "relu"}}
+        )
+        out = net.get_default_output_layer().output.placeholder
+        assert out.op.type == "Relu" and out.op.get_attr("_XlaCompile")
+        concat_ops = [op for op in session.graph.get_operations() if op.type == "ConcatV2"]
+        assert concat_ops and all(op.get_attr("_XlaCompile") for op in concat_ops)
+        v = session.run(out, feed_dict=make_feed_dict(net.extern_data))
+        assert (v >= 0.0).all()
+
+
+def test_LinearLayer_use_xla_batch_norm():
+    from returnn.tf.util.data import batch_dim
+
+    time_dim = SpatialDim("time")
+    feat_dim = FeatureDim("feature", dimension=5)
+    config = Config({"extern_data": {"data": {"dim_tags": [batch_dim, time_dim, feat_dim]}}, "use_xla": True})
+    with make_scope() as session:
+        net = TFNetwork(config=config, train_flag=True)
+        net.construct_from_dict(
+            {
+                "output": {
+                    "class": "linear",
+                    "from": "data",
+                    "n_out": 3,
+                    "activation": "relu",
+                    "batch_norm": {"masked_time": True},
+                }
+            }
+        )
+        out = net.get_default_output_layer().output.placeholder
+        assert "batch_norm" in out.name and out.op.get_attr("_XlaCompile")
+        net.initialize_params(session)
+        fetches = net.get_fetches_dict()
+        fetches["out"] = out
+        session.run(fetches, feed_dict=make_feed_dict(net.extern_data))
+
+
+def test_LinearLayer_sparse_embedding_dense_matmul():
+    from returnn.tf.util.data import batch_dim
+
+    time_dim = SpatialDim("time")
+    config = Config({"extern_data": {"data": {"dim_tags": [batch_dim, time_dim], "sparse": True, "dim": 7}}})
+    net_dict = {"output": {"class": "linear", "from": "data", "n_out": 3, "bias_init": 1.0}}
+    outputs = []
+    for threshold in [0, 10]:
+        config.set("embedding_dense_matmul_threshold", threshold)
+        with make_scope() as session:
+            net = TFNetwork(config=config)
+            net.construct_from_dict(net_dict)
+            out = net.get_default_output_layer().output
+            assert out.placeholder.get_shape().ndims == 3 and out.placeholder.get_shape()[-1] == 3
+            ops = [op.type for op in session.graph.get_operations()]
+            assert ("SparseTensorDenseMatMul" in ops) == (threshold > 0)
+            net.get_default_output_layer().params["W"].load(
+                numpy.arange(7 * 3).reshape((7, 3)).astype("float32"), session=session
+            )
+            session.run(tf_compat.v1.variables_initializer([net.get_default_output_layer().params["b"]]))
+            feed_dict = make_feed_dict(net.extern_data, n_batch=2, n_time=5)
+            outputs.append(session.run(out.placeholder, feed_dict=feed_dict))
+    numpy.testing.assert_allclose(outputs[0], outputs[1])
+
+
 def test_LinearLayer_in_dim_spatial():
     from returnn.tf.util.data import batch_dim
 
@@ -662,6 +751,42 @@ def test_concat_sources_batch_dim():
         session.run(out.output.placeholder)
 
 
+def test_concat_sources_batch_dim_majority():
+    with make_scope() as session:
+        network = TFNetwork(train_flag=True, extern_data=ExternData())
+        n_batch = 5
+        n_time = 3
+        size_placeholder = {0: tf.constant(n_time, dtype=tf.int32, shape=(n_batch,))}
+        srcs = []
+        for i, (dim, time_major) in enumerate([(11, False), (13, True), (7, True)]):
+            shape = (n_time, n_batch, dim) if time_major else (n_batch, n_time, dim)
+            src = InternalLayer(
+                name="src%i" % (i + 1),
+                network=network,
+                output=Data(
+                    name="src%i_output" % (i + 1),
+                    shape=(None, dim),
+                    time_dim_axis=0 if time_major else 1,
+                    batch_dim_axis=1 if time_major else 0,
+                    placeholder=tf.fill(shape, float(i + 1)),
+                    size_placeholder=size_placeholder,
+                ),
+            )
+            print("src output:", src.output)
+            srcs.append(src)
+        out_kwargs = dict(name="out", sources=srcs, network=network)
+        out_output = CopyLayer.get_out_data_from_opts(**out_kwargs)
+        print("out output:", out_output)
+        assert out_output.dim == 11 + 13 + 7
+        assert out_output.batch_dim_axis == 1 and out_output.time_dim_axis == 0
+        out = CopyLayer(output=out_output, **out_kwargs)
+        v = session.run(out.output.placeholder)
+        assert v.shape == (n_time, n_batch, 11 + 13 + 7)
+        numpy.testing.assert_equal(v[:, :, :11], 1.0)
+        numpy.testing.assert_equal(v[:, :, 11:24], 2.0)
+        numpy.testing.assert_equal(v[:, :, 24:], 3.0)
+
+
 def test_concat_sources_missing_dim():
     with make_scope() as session:
         network = TFNetwork(train_flag=True, extern_data=ExternData())
@@ -973,6 +1098,45 @@ def test_batch_norm_fused():
         assert not numpy.allclose(out_np, 0.0)
 
 
+def test_batch_norm_fold_linear():
+    n_in, n_out = 3, 5
+    bn_opts = {"masked_time": False, "param_version": 2, "update_sample_only_in_training": True}
+    net_dict = {
+        "linear": {"class": "linear", "from": "data:data", "n_out": n_out},
+        "bn": {"class": "batch_norm", "from": "linear", **bn_opts},
+        "linear_bn": {"class": "linear", "from": "data:data", "n_out": n_out, "batch_norm": bn_opts},
+        # The source post-processes its output with its own batch norm, so this must not be folded.
+        "linear_bn_bn": {"class": "batch_norm", "from": "linear_bn", **bn_opts},
+        "output": {"class": "copy", "from": ["bn", "linear_bn", "linear_bn_bn"]},
+    }
+    rnd = numpy.random.RandomState(42)
+    param_values = None
+    outputs = {}
+
+    for fold in [False, True]:
+        with make_scope() as session:
+            config = Config({"extern_data": {"data": {"dim": n_in}}, "batch_norm_fold_linear": fold})
+            network = TFNetwork(config=config, train_flag=False)
+            network.construct_from_dict(net_dict)
+            for name in ["bn", "linear_bn"]:
+                out_name = network.get_layer(name).output.placeholder.name
+                assert ("linear_folded_scale_shift" in out_name) == fold, "%s: %s" % (name, out_name)
+            out_name = network.get_layer("linear_bn_bn").output.placeholder.name
+            assert "linear_folded_scale_shift" not in out_name, out_name
+            network.initialize_params(session)
+            if param_values is None:
+                param_values = network.get_param_values_dict(session)
+                for layer_values in param_values.values():
+                    for key, value in layer_values.items():
+                        layer_values[key] = rnd.uniform(0.5, 1.5, size=value.shape).astype(value.dtype)
+            network.set_param_values_by_dict(param_values, session=session)
+            outputs[fold] = session.run(
+                network.get_default_output_layer().output.placeholder, feed_dict=make_feed_dict(network.extern_data)
+            )
+
+    numpy.testing.assert_allclose(outputs[True], outputs[False], rtol=1e-5)
+
+
 def test_batch_norm():
     with make_scope() as session:
         net = TFNetwork(extern_data=ExternData(), train_flag=True)
@@ -1145,11 +1309,95 @@ def test_BatchNormLayer_static_time():
         net.construct_from_dict(net_dict)
         net.initialize_params(session)
         out = net.get_default_output_layer().output
+        # Static time, so no masking needed, and we can use the fused op.
+        assert any("FusedBatchNorm" in op.type for op in session.graph.get_operations())
         fetches = net.get_fetches_dict()
         fetches["out"] = out.placeholder
         session.run(fetches, feed_dict=make_feed_dict(net.extern_data))
 
 
+def test_BatchNormLayer_moving_average_update():
+    from returnn.tf.util.data import batch_dim, SpatialDim, FeatureDim
+
+    time_dim = SpatialDim("time")
+    in_dim = FeatureDim("in", 5)
+    config = Config(dict(extern_data={"data": {"dim_tags": (batch_dim, time_dim, in_dim)}}))
+    momentum = 0.1
+
+    # use_sample=1: the current batch statistics are only used for the running average.
+    for use_sample in [0.0, 1.0]:
+        print("use_sample:", use_sample)
+        net_dict = {
+            "output": {
+                "class": "batch_norm",
+                "from": "data",
+                "masked_time": True,
+                "momentum": momentum,
+                "use_sample": use_sample,
+            },
+        }
+
+        with make_scope() as session:
+            net = TFNetwork(config=config, train_flag=True)
+            net.construct_from_dict(net_dict)
+            net.initialize_params(session)
+            layer = net.get_default_output_layer()
+            mean_var, variance_var = layer.params["batch_norm/v2_mean"], layer.params["batch_norm/v2_variance"]
+            feed_dict = make_feed_dict(net.extern_data)
+            fetches = net.get_fetches_dict()
+            fetches["out"] = layer.output.placeholder
+            session.run(fetches, feed_dict=feed_dict)
+            x = feed_dict[net.extern_data.get_default_input_data().placeholder]
+            seq_lens = feed_dict[net.extern_data.get_default_input_data().get_sequence_lengths()]
+            x = numpy.concatenate([x[b, : seq_lens[b]] for b in range(len(seq_lens))], axis=0)
+            numpy.testing.assert_allclose(session.run(mean_var), momentum * x.mean(axis=0), rtol=1e-5, atol=1e-6)
+            numpy.testing.assert_allclose(
+                session.run(variance_var), (1.0 - momentum) + momentum * x.var(axis=0), rtol=1e-5, atol=1e-6
+            )
+
+
+def test_BatchNormLayer_param_dtype_float16():
+    from returnn.tf.util.data import batch_dim, SpatialDim, FeatureDim
+
+    time_dim = SpatialDim("time")
+    in_dim = FeatureDim("in", 5)
+    config = Config(dict(extern_data={"data": {"dim_tags": (batch_dim, time_dim, in_dim)}}))
+    momentum = 0.1
+    net_dict = {
+        "output": {
+            "class": "batch_norm",
+            "from": "data",
+            "masked_time": True,
+            "momentum": momentum,
+            "param_dtype": "float16",
+        },
+    }
+
+    for train_flag in [True, False]:
+        print("train flag:", train_flag)
+        with make_scope() as session:
+            net = TFNetwork(config=config, train_flag=train_flag)
+            net.construct_from_dict(net_dict)
+            net.initialize_params(session)
+            layer = net.get_default_output_layer()
+            for param in layer.params.values():
+                assert_equal(param.dtype.base_dtype, tf.float16)
+            assert_equal(layer.output.placeholder.dtype, tf.float32)
+            mean_var = layer.params["batch_norm/v2_mean"]
+            feed_dict = make_feed_dict(net.extern_data)
+            fetches = net.get_fetches_dict()
+            fetches["out"] = layer.output.placeholder
+            out = session.run(fetches, feed_dict=feed_dict)["out"]
+            x = feed_dict[net.extern_data.get_default_input_data().placeholder]
+            if train_flag:
+                seq_lens = feed_dict[net.extern_data.get_default_input_data().get_sequence_lengths()]
+                x = numpy.concatenate([x[b, : seq_lens[b]] for b in range(len(seq_lens))], axis=0)
+                numpy.testing.assert_allclose(session.run(mean_var), momentum * x.mean(axis=0), rtol=1e-2, atol=1e-3)
+            else:
+                # Initial mean 0, variance 1, gamma 1, beta 0.
+                numpy.testing.assert_allclose(out, x / numpy.sqrt(1.0 + 1e-3), rtol=1e-3, atol=1e-3)
+
+
 def test_BatchNormLayer_dyn_time_scalar():
     from returnn.tensor import batch_dim, Dim, Tensor
 
@@ -1544,6 +1792,65 @@ def test_CombineLayer_simple_add():
         session.run(out.output.placeholder, feed_dict=feed_dict)
 
 
+def test_CombineLayer_add_n():
+    with make_scope() as session:
+        net_dict = {
+            "lin1": {"class": "linear", "n_out": 5, "from": "data:data"},
+            "lin2": {"class": "linear", "n_out": 5, "from": "data:data"},
+            "lin3": {"class": "linear", "n_out": 5, "from": "data:data"},
+            "combine": {"class": "combine", "kind": "add", "from": ["lin1", "lin2", "lin3"], "is_output_layer": True},
+            "average": {
+                "class": "combine",
+                "kind": "average",
+                "from": ["lin1", "lin2", "lin3"],
+                "is_output_layer": True,
+            },
+        }
+        config = Config({"extern_data": {"data": {"dim": 4}}})
+        network = TFNetwork(config=config)
+        network.construct_from_dict(net_dict)
+        assert_equal(network.get_layer("combine").output.placeholder.op.type, "AddN")
+        assert_equal(network.get_layer("average").output.placeholder.op.type, "Mul")
+        feed_dict = make_feed_dict(network.extern_data)
+        session.run(tf_compat.v1.global_variables_initializer())
+        lin_vs, combine_v, average_v = session.run(
+            (
+                [network.get_layer("lin%i" % i).output.placeholder for i in range(1, 4)],
+                network.get_layer("combine").output.placeholder,
+                network.get_layer("average").output.placeholder,
+            ),
+            feed_dict=feed_dict,
+        )
+        numpy.testing.assert_allclose(combine_v, sum(lin_vs), rtol=1e-5)
+        numpy.testing.assert_allclose(average_v, sum(lin_vs) / 3.0, rtol=1e-5)
+
+
+def test_CombineLayer_with_bias():
+    with make_scope() as session:
+        net_dict = {
+            "lin1": {"class": "linear", "n_out": 5, "from": "data:data"},
+            "lin2": {"class": "linear", "n_out": 5, "from": "data:data"},
+            "output": {"class": "combine", "kind": "mul", "from": ["lin1", "lin2"], "with_bias": True},
+        }
+        config = Config({"extern_data": {"data": {"dim": 4}}})
+        network = TFNetwork(config=config)
+        network.construct_from_dict(net_dict)
+        layer = network.get_default_output_layer()
+        assert_equal(layer.output.placeholder.op.type, "BiasAdd")
+        feed_dict = make_feed_dict(network.extern_data)
+        session.run(tf_compat.v1.global_variables_initializer())
+        session.run(tf_compat.v1.assign(layer.params["b"], numpy.arange(5, dtype="float32")))
+        lin1_v, lin2_v, out_v = session.run(
+            (
+                network.get_layer("lin1").output.placeholder,
+                network.get_layer("lin2").output.placeholder,
+                layer.output.placeholder,
+            ),
+            feed_dict=feed_dict,
+        )
+        numpy.testing.assert_allclose(out_v, lin1_v * lin2_v + numpy.arange(5), rtol=1e-5)
+
+
 def test_CombineLayer_broadcast():
     with make_scope() as session:
         net_dict = {
@@ -2340,6 +2647,21 @@ def test_DropoutLayer_axis():
         )
 
 
+def test_DropoutLayer_default_noise_shape():
+    with make_scope() as session:
+        net_dict = {
+            "drop": {"class": "dropout", "dropout": 0.3, "from": "data:data"},
+            "output": {"class": "softmax", "loss": "ce", "from": "drop"},
+        }
+        config = Config({"num_inputs": 4, "num_outputs": 9})
+        network = TFNetwork(config=config, train_flag=True)
+        network.construct_from_dict(net_dict)
+        rnd_ops = [op for op in session.graph.get_operations() if op.type == "RandomUniform" and "/dropout/" in op.name]
+        assert_equal(len(rnd_ops), 1)
+        # The mask is only over the feature dim, broadcast over batch and time.
+        assert_equal(rnd_ops[0].outputs[0].shape.as_list(), [1, 1, 4])
+
+
 def test_ScaledGradientLayer_tensor():
     from returnn.tf.util.data import batch_dim, SpatialDim, FeatureDim
 
@@ -2697,6 +3019,31 @@ def test_ReduceLayer_mean():
             numpy.testing.assert_almost_equal(out_v[b], in_v[b, : seq_len[b]].mean(axis=0))
 
 
+def test_ReduceLayer_multiple_axes():
+    from returnn.tf.util.data import batch_dim
+
+    time_dim = SpatialDim("time")
+    other_dim = SpatialDim("other", 3)
+    feat_dim = FeatureDim("feature", 5)
+    extra_dim = SpatialDim("extra", 2)
+    config = Config({"extern_data": {"data": {"dim_tags": [time_dim, batch_dim, other_dim, feat_dim, extra_dim]}}})
+    with make_scope() as session:
+        network = TFNetwork(config=config)
+        network.construct_from_dict(
+            {"output": {"class": "reduce", "mode": "max", "from": "data", "axes": [time_dim, other_dim, extra_dim]}}
+        )
+        out = network.get_default_output_layer().output
+        assert_equal(out.dim_tags, (batch_dim, feat_dim))
+        assert out.batch_dim_axis == 0 and out.feature_dim_axis == 1
+        in_ = network.extern_data.get_default_input_data()
+        in_v, seq_len, out_v = session.run(
+            (in_.placeholder, in_.get_sequence_lengths(), out.placeholder),
+            feed_dict=make_feed_dict(network.extern_data),
+        )
+        for b in range(in_v.shape[1]):
+            numpy.testing.assert_almost_equal(out_v[b], in_v[: seq_len[b], b].max(axis=(0, 1, 3)))
+
+
 def test_reduce_repeat_1102():
     # https://github.com/rwth-i6/returnn/issues/1102
     from returnn.tf.util.data import batch_dim, SpatialDim, FeatureDim
@@ -7528,6 +7875,18 @@ def test_SliceLayer_output_placeholder():
         assert_equal(seq_lens.tolist(), [2, 1, 1])
 
 
+def test_SliceLayer_no_op():
+    with make_scope():
+        net = TFNetwork(extern_data=ExternData())
+        src = InternalLayer(name="src", network=net, output=Data(**{"name": "src", "dim": 20, "sparse": True}))
+        src.output.placeholder = tf.constant([[1, 2, 3, 4, 5], [6, 7, 8, 9, 10], [11, 12, 13, 14, 15]], dtype=tf.int32)
+        src.output.size_placeholder = {0: tf.constant([5, 3, 2], dtype=tf.int32)}
+        opts = dict(name="slice", network=net, axis="T", slice_start=0, slice_step=1, sources=[src])
+        layer = SliceLayer(output=SliceLayer.get_out_data_from_opts(**opts), **opts)
+        assert layer.output.placeholder is src.output.placeholder
+        assert layer.output.get_time_dim_tag() == src.output.get_time_dim_tag()
+
+
 def test_SliceLayer_NCHW():
     with make_scope() as session:
         import numpy as np
@@ -8552,6 +8911,174 @@ def test_ConvLayer_2d_device_based_opt():
                 assert conv_layer.output.feature_dim_axis == 3 and conv_layer.output.dim == 32
 
 
+def test_ConvLayer_2d_float16_channel_last():
+    from returnn.tf.util.data import batch_dim
+
+    time_dim = SpatialDim("time")
+    feat_dim = FeatureDim("input", 5)
+    extra_dim = FeatureDim("extra", 1)
+    out_dim = FeatureDim("out", 4)
+    filter_dims = [SpatialDim("filter0", 3), SpatialDim("filter1", 3)]
+    config = Config(
+        {"extern_data": {"data": {"dim_tags": [batch_dim, time_dim, feat_dim, extra_dim], "dtype": "float16"}}}
+    )
+    # Pretend that we have a GPU.
+    with tf.Graph().as_default(), mock.patch.object(tf_util, "is_gpu_available_in_session", return_value=True):
+        net = TFNetwork(config=config)
+        net_dict = {
+            "filter": {
+                "class": "variable",
+                "shape": filter_dims + [extra_dim, out_dim],
+                "dtype": "float16",
+                "add_batch_axis": False,
+            },
+            "output": {
+                "class": "conv",
+                "from": "data",
+                "filter": "filter",
+                "filter_size": filter_dims,
+                "in_spatial_dims": [time_dim, feat_dim],
+                "out_dim": out_dim,
+                "padding": "same",
+                "with_bias": False,
+            },
+        }
+        net.construct_from_dict(net_dict)
+        conv_layer = net.get_default_output_layer()
+        print("conv layer:", conv_layer)
+        assert conv_layer.output.dim_tags[1:3] == (time_dim, feat_dim)
+        assert conv_layer.output.feature_dim_axis == 3 and conv_layer.output.dim == 4
+
+
+def test_ConvLayer_bias_add():
+    from returnn.tf.util.data import batch_dim
+
+    time_dim = SpatialDim("time")
+    feat_dim = FeatureDim("input", 5)
+    config = Config({"extern_data": {"data": {"dim_tags": [batch_dim, time_dim, feat_dim]}}})
+    with make_scope() as session:
+        net = TFNetwork(config=config)
+        net.construct_from_dict(
+            {
+                "output": {
+                    "class": "conv",
+                    "from": "data",
+                    "filter_size": [3],
+                    "padding": "same",
+                    "n_out": 4,
+                    "with_bias": True,
+                    "activation": "relu",
+                }
+            }
+        )
+        out = net.get_default_output_layer().output.placeholder
+        # Conv + BiasAdd + Relu is the pattern which Grappler can fuse into a single op.
+        assert out.op.type == "Relu"
+        assert out.op.inputs[0].op.type == "BiasAdd"
+        session.run(tf_compat.v1.global_variables_initializer())
+        v = session.run(out, feed_dict=make_feed_dict(net.extern_data))
+        assert (v >= 0.0).all()
+
+
+def test_ConvLayer_bias_layer_bias_add():
+    from returnn.tf.util.data import batch_dim
+
+    time_dim = SpatialDim("time")
+    feat_dim = FeatureDim("input", 5)
+    out_dim = FeatureDim("out", 4)
+    config = Config({"extern_data": {"data": {"dim_tags": [batch_dim, time_dim, feat_dim]}}})
+    with make_scope() as session:
+        net = TFNetwork(config=config)
+        net.construct_from_dict(
+            {
+                "bias": {"class": "variable", "shape": [out_dim], "init": "glorot_uniform"},
+                "conv": {
+                    "class": "conv",
+                    "from": "data",
+                    "filter_size": [3],
+                    "padding": "same",
+                    "out_dim": out_dim,
+                    "with_bias": False,
+                },
+                "output": {
+                    "class": "conv",
+                    "from": "data",
+                    "filter_size": [3],
+                    "padding": "same",
+                    "out_dim": out_dim,
+                    "bias": "bias",
+                    "reuse_params": "conv",
+                },
+            }
+        )
+        out = net.get_default_output_layer().output
+        assert out.placeholder.op.type == "BiasAdd"
+        session.run(tf_compat.v1.global_variables_initializer())
+        conv = net.get_layer("conv").output.copy_compatible_to(out)
+        v, conv_v, bias_v = session.run(
+            (out.placeholder, conv.placeholder, net.get_layer("bias").output.placeholder),
+            feed_dict=make_feed_dict(net.extern_data),
+        )
+        numpy.testing.assert_allclose(v, conv_v + bias_v, rtol=1e-5, atol=1e-6)
+
+
+def test_ConvLayer_pad_seq_len_to_power():
+    from returnn.tf.util.data import batch_dim
+
+    time_dim = SpatialDim("time")
+    feat_dim = FeatureDim("input", 5)
+    out_dim = FeatureDim("out", 4)
+    config = Config({"extern_data": {"data": {"dim_tags": [batch_dim, time_dim, feat_dim]}}})
+    with make_scope() as session:
+        net = TFNetwork(config=config)
+        conv_opts = {"class": "conv", "from": "data", "filter_size": [3], "padding": "same", "out_dim": out_dim}
+        net.construct_from_dict(
+            {
+                "conv": conv_opts,
+                "output": dict(conv_opts, pad_seq_len_to_power=2.0, reuse_params="conv"),
+            }
+        )
+        out = net.get_default_output_layer().output.copy_as_batch_major()
+        conv = net.get_layer("conv").output.copy_as_batch_major()
+        session.run(tf_compat.v1.global_variables_initializer())
+        feed_dict = make_feed_dict(net.extern_data, n_time=5)
+        v, conv_v = session.run((out.placeholder, conv.placeholder), feed_dict=feed_dict)
+        assert_equal(v.shape, conv_v.shape)
+        numpy.testing.assert_allclose(v, conv_v, rtol=1e-5, atol=1e-6)
+
+
+def test_PoolLayer_2d_device_based_layout():
+    from returnn.tf.util.data import batch_dim
+
+    for dtype in ["float32", "float16"]:
+        time_dim = SpatialDim("time")
+        feat_dim = FeatureDim("input", 6)
+        extra_dim = FeatureDim("extra", 1)
+        config = Config(
+            {"extern_data": {"data": {"dim_tags": [batch_dim, time_dim, feat_dim, extra_dim], "dtype": dtype}}}
+        )
+        # Pretend that we have a GPU.
+        with tf.Graph().as_default(), mock.patch.object(tf_util, "is_gpu_available_in_session", return_value=True):
+            net = TFNetwork(config=config)
+            net.construct_from_dict(
+                {
+                    "output": {
+                        "class": "pool",
+                        "from": "data",
+                        "mode": "max",
+                        "pool_size": (2, 2),
+                        "in_spatial_dims": [time_dim, feat_dim],
+                        "padding": "same",
+                    },
+                }
+            )
+            layer = net.get_default_output_layer()
+            print(layer, layer.output)
+            assert layer.output.dtype == dtype
+            # NCHW for float32 on GPU, NHWC for float16.
+            assert layer.output.feature_dim_axis == (1 if dtype == "float32" else 3)
+
+
 def test_ConvLayer_unrelated_dim():
     from returnn.tf.util.data import batch_dim
 
@@ -8593,6 +9120,44 @@ def test_ConvLayer_unrelated_dim():
         )
 
 
+def test_ConvLayer_in_spatial_dims_unsorted():
+    from returnn.tf.util.data import batch_dim
+
+    time_dim = SpatialDim("time")
+    other_dim = SpatialDim("other", 5)
+    feat_dim = FeatureDim("input", 3)
+    out_dim = FeatureDim("out", 4)
+    filter_dims = [SpatialDim("filter-time", 3), SpatialDim("filter-other", 2)]
+    config = Config({"extern_data": {"data": {"dim_tags": [batch_dim, time_dim, other_dim, feat_dim]}}})
+    with make_scope() as session:
+        net = TFNetwork(config=config)
+        conv_opts = {
+            "class": "conv",
+            "from": "data",
+            "filter": "filter",
+            "out_dim": out_dim,
+            "padding": "same",
+            "with_bias": False,
+            "is_output_layer": True,
+        }
+        net.construct_from_dict(
+            {
+                "filter": {"class": "variable", "shape": filter_dims + [feat_dim, out_dim], "add_batch_axis": False},
+                "conv_sorted": dict(in_spatial_dims=[time_dim, other_dim], filter_size=filter_dims, **conv_opts),
+                "conv_unsorted": dict(
+                    in_spatial_dims=[other_dim, time_dim], filter_size=filter_dims[::-1], **conv_opts
+                ),
+            }
+        )
+        out_sorted = net.get_layer("conv_sorted").output
+        out_unsorted = net.get_layer("conv_unsorted").output.copy_compatible_to(out_sorted)
+        net.initialize_params(session)
+        v_sorted, v_unsorted = session.run(
+            (out_sorted.placeholder, out_unsorted.placeholder), feed_dict=make_feed_dict(net.extern_data)
+        )
+        numpy.testing.assert_allclose(v_sorted, v_unsorted, rtol=1e-5, atol=1e-5)
+
+
 def test_conv_layer_NCHW():
     with make_scope() as session:
         import numpy as np
@@ -12098,6 +12663,225 @@ def test_CrossEntropyLoss():
             last_loss_v = loss_v
 
 
+def test_CrossEntropyLoss_focal_loss():
+    with make_scope() as session:
+        n_out = 5
+        focal_loss_factor = 2.0
+        config = Config({"extern_data": {"data": {"dim": 3}, "classes": {"dim": n_out, "sparse": True}}})
+        net = TFNetwork(config=config, train_flag=True)
+        net.construct_from_dict(
+            {
+                "output": {
+                    "class": "softmax",
+                    "from": "data",
+                    "loss": "ce",
+                    "loss_opts": {"focal_loss_factor": focal_loss_factor},
+                    "target": "classes",
+                }
+            }
+        )
+        losses_dict, _, _ = net.get_losses_initialized()
+        loss_t = losses_dict["output"].get_loss_value()
+        # The target scores for the focal loss factor are derived from the CE, not from another softmax.
+        assert_equal(len([op for op in session.graph.get_operations() if op.type == "Softmax"]), 1)
+        session.run(tf_compat.v1.global_variables_initializer())
+        feed_dict = make_feed_dict(net.extern_data.data.values(), same_time=True)
+        out_t = net.get_default_output_layer().output.copy_as_batch_major().placeholder
+        loss_v, out_v = session.run((loss_t, out_t), feed_dict=feed_dict)
+        classes = feed_dict[net.extern_data.data["classes"].placeholder]
+        seq_lens = feed_dict[net.extern_data.data["classes"].size_placeholder[0]]
+        ref_loss_v = 0.0
+        for b in range(classes.shape[0]):
+            for t in range(seq_lens[b]):
+                p = out_v[b, t, classes[b, t]]
+                ref_loss_v -= numpy.log(p) * (1.0 - p) ** focal_loss_factor
+        numpy.testing.assert_allclose(loss_v, ref_loss_v, rtol=1e-4)
+
+
+def test_CrossEntropyLoss_dense_target_error():
+    with make_scope() as session:
+        n_out = 5
+        config = Config({"extern_data": {"data": {"dim": 3}, "classes": {"dim": n_out, "sparse": False}}})
+        net = TFNetwork(config=config, train_flag=True)
+        net.construct_from_dict({"output": {"class": "softmax", "from": "data", "loss": "ce", "target": "classes"}})
+        losses_dict, _, _ = net.get_losses_initialized()
+        error_t = losses_dict["output"].get_error_value()
+        assert_equal(len([op for op in session.graph.get_operations() if op.type == "ArgMax"]), 2)
+        assert not [op for op in session.graph.get_operations() if op.type == "Rank" and "frame_error" in op.name]
+        session.run(tf_compat.v1.global_variables_initializer())
+        feed_dict = make_feed_dict(net.extern_data.data.values(), same_time=True)
+        out_t = net.get_default_output_layer().output.copy_as_batch_major().placeholder
+        error_v, out_v = session.run((error_t, out_t), feed_dict=feed_dict)
+        classes = feed_dict[net.extern_data.data["classes"].placeholder]
+        seq_lens = feed_dict[net.extern_data.data["classes"].size_placeholder[0]]
+        ref_error_v = 0.0
+        for b in range(classes.shape[0]):
+            for t in range(seq_lens[b]):
+                ref_error_v += float(numpy.argmax(out_v[b, t]) != numpy.argmax(classes[b, t]))
+        numpy.testing.assert_allclose(error_v, ref_error_v)
+
+
+def test_CtcLoss_shared_logits():
+    with make_scope() as session:
+        n_out = 4
+        config = Config({"extern_data": {"data": {"dim": 3}, "classes": {"dim": n_out, "sparse": True}}})
+        net = TFNetwork(config=config, train_flag=True)
+        net.construct_from_dict(
+            {"output": {"class": "softmax", "from": "data", "n_out": n_out + 1, "loss": "ctc", "target": "classes"}}
+        )
+        out_layer = net.get_default_output_layer()
+        assert out_layer.output.is_batch_major
+        losses_dict, _, _ = net.get_losses_initialized()
+        loss_t = losses_dict["output"].get_loss_value()
+        error_t = losses_dict["output"].get_error_value()
+        # The (B,T,N) => (T,B,N) transpose of the logits is shared by the loss and the error.
+        logits_bm = out_layer.output_before_activation.x
+        assert_equal(
+            len([op for op in session.graph.get_operations() if op.type == "Transpose" and op.inputs[0] is logits_bm]),
+            1,
+        )
+        ref_loss_t = tf.reduce_sum(
+            tf_compat.v1.nn.ctc_loss(
+                inputs=logits_bm,
+                labels=tf_util.sparse_labels(
+                    net.extern_data.data["classes"].placeholder, net.extern_data.data["classes"].get_sequence_lengths()
+                ),
+                sequence_length=out_layer.output.get_sequence_lengths(),
+                time_major=False,
+            )
+        )
+        # The greedy decoding for the error is done via TF ops, not via the CPU-only CTCGreedyDecoder.
+        assert not [op for op in session.graph.get_operations() if op.type == "CTCGreedyDecoder"]
+        ref_decoded = tf.nn.ctc_greedy_decoder(
+            inputs=tf.transpose(logits_bm, [1, 0, 2]), sequence_length=out_layer.output.get_sequence_lengths()
+        )[0][0]
+        ref_error_t = tf.reduce_sum(
+            tf.edit_distance(
+                hypothesis=tf.cast(ref_decoded, tf.int32),
+                truth=losses_dict["output"].loss._get_target_sparse_labels(),
+                normalize=False,
+            )
+        )
+        session.run(tf_compat.v1.global_variables_initializer())
+        feed_dict = make_feed_dict(net.extern_data.data.values(), n_time=7)
+        feed_dict[net.extern_data.data["classes"].size_placeholder[0]] = [3, 2, 2]
+        loss_v, ref_loss_v, error_v, ref_error_v = session.run(
+            (loss_t, ref_loss_t, error_t, ref_error_t), feed_dict=feed_dict
+        )
+        numpy.testing.assert_allclose(loss_v, ref_loss_v, rtol=1e-5)
+        numpy.testing.assert_allclose(error_v, ref_error_v)
+
+
+def test_CtcLoss_use_ctc_loss_v2():
+    with make_scope() as session:
+        n_out = 4
+        config = Config({"extern_data": {"data": {"dim": 3}, "classes": {"dim": n_out, "sparse": True}}})
+        net = TFNetwork(config=config, train_flag=True)
+        net.construct_from_dict(
+            {
+                "output": {"class": "softmax", "from": "data", "n_out": n_out + 1, "loss": "ctc", "target": "classes"},
+                "output_v2": {
+                    "class": "copy",
+                    "from": "output",
+                    "loss": "ctc",
+                    "loss_opts": {"use_ctc_loss_v2": True},
+                    "target": "classes",
+                },
+            }
+        )
+        losses_dict, _, _ = net.get_losses_initialized()
+        loss_t = losses_dict["output"].get_loss_value()
+        loss_v2_t = losses_dict["output_v2"].get_loss_value()
+        session.run(tf_compat.v1.global_variables_initializer())
+        feed_dict = make_feed_dict(net.extern_data.data.values(), n_time=7)
+        feed_dict[net.extern_data.data["classes"].size_placeholder[0]] = [3, 2, 2]
+        loss_v, loss_v2_v = session.run((loss_t, loss_v2_t), feed_dict=feed_dict)
+        numpy.testing.assert_allclose(loss_v, loss_v2_v, rtol=1e-5)
+
+
+def test_GenericCELoss():
+    with make_scope() as session:
+        n_out = 5
+        config = Config({"extern_data": {"data": {"dim": 3}, "classes": {"dim": n_out, "sparse": True}}})
+        net = TFNetwork(config=config, train_flag=True)
+        net.construct_from_dict(
+            {
+                "output": {
+                    "class": "linear",
+                    "activation": "exp",
+                    "from": "data",
+                    "loss": "generic_ce",
+                    "target": "classes",
+                    "n_out": n_out,
+                }
+            }
+        )
+        losses_dict, _, _ = net.get_losses_initialized()
+        loss_t = losses_dict["output"].get_loss_value()
+        # With exp activation, the normalization is done via softmax of the logits.
+        assert "Softmax" in [op.type for op in session.graph.get_operations()]
+        grad_t = tf.gradients(loss_t, net.get_default_output_layer().output_before_activation.x)[0]
+        session.run(tf_compat.v1.global_variables_initializer())
+        feed_dict = make_feed_dict(net.extern_data.data.values(), same_time=True)
+        out_t = net.get_default_output_layer().output.copy_as_batch_major().placeholder
+        loss_v, out_v, _ = session.run((loss_t, out_t, grad_t), feed_dict=feed_dict)
+        classes = feed_dict[net.extern_data.data["classes"].placeholder]
+        seq_lens = feed_dict[net.extern_data.data["classes"].size_placeholder[0]]
+        ref_loss_v = 0.0
+        for b in range(classes.shape[0]):
+            for t in range(seq_lens[b]):
+                ref_loss_v -= numpy.log(out_v[b, t, classes[b, t]] / numpy.sum(out_v[b, t]))
+        numpy.testing.assert_allclose(loss_v, ref_loss_v, rtol=1e-4)
+
+
+def test_FramewiseStatisticsLayer():
+    with make_scope() as session:
+        n_out = 5
+        config = Config({"extern_data": {"data": {"dim": 3}, "classes": {"dim": n_out, "sparse": True}}})
+        net = TFNetwork(config=config, train_flag=True)
+        net.construct_from_dict(
+            {
+                "output": {"class": "softmax", "from": "data", "loss": "ce", "target": "classes"},
+                "stats": {
+                    "class": "framewise_statistics",
+                    "from": "output",
+                    "sil_label_idx": 0,
+                    "is_output_layer": True,
+                },
+            }
+        )
+        losses_dict, _, _ = net.get_losses_initialized()
+        error_t = losses_dict["output"].get_error_value()
+        stats = net.get_layer("stats").stats
+        # Frame error of the loss and of the stats share the same output argmax.
+        assert_equal(len([op for op in session.graph.get_operations() if op.type == "ArgMax"]), 1)
+        # The sil mask is used for all stats. The no-sil stats are derived from the totals.
+        where_ops = [op for op in session.graph.get_operations() if op.type == "Where"]
+        where_ops = [op for op in where_ops if op.name.startswith("stats/") and "flatten" not in op.name]
+        assert_equal(len(where_ops), 1)
+        session.run(tf_compat.v1.global_variables_initializer())
+        feed_dict = make_feed_dict(net.extern_data.data.values(), same_time=True)
+        error_v, stats_v = session.run((error_t, stats), feed_dict=feed_dict)
+        num_frames = numpy.sum(feed_dict[net.extern_data.data["classes"].size_placeholder[0]])
+        numpy.testing.assert_allclose(error_v / num_frames, stats_v["batch_frame_error"], rtol=1e-5)
+        assert_equal(stats_v["batch_true_label_prob_histogram"].shape, (20,))  # default histogram_num_bins
+        numpy.testing.assert_allclose(numpy.sum(stats_v["batch_true_label_prob_histogram"]), 1.0, rtol=1e-5)
+        numpy.testing.assert_allclose(  # nan_to_num: mean over no frames is nan
+            numpy.nan_to_num(stats_v["batch_frame_error_sil"]) * stats_v["batch_seq_length_sil"]
+            + numpy.nan_to_num(stats_v["batch_frame_error_no_sil"]) * stats_v["batch_seq_length_no_sil"],
+            stats_v["batch_frame_error"] * stats_v["batch_seq_length"],
+            rtol=1e-5,
+        )
+        for prefix in ["batch", "accumulated"]:
+            numpy.testing.assert_allclose(
+                stats_v["%s_loss_perplexity" % prefix], numpy.exp(stats_v["%s_loss_ce" % prefix]), rtol=1e-5
+            )
+        # The accumulator variables, including the no-sil ones, must stay, such that old checkpoints can be loaded.
+        acc_vars = [v.name for v in tf_compat.v1.global_variables() if v.name.startswith("stats/accumulated_")]
+        assert_equal(len(acc_vars), 11)
+        assert "stats/accumulated_frame_error_no_sil:0" in acc_vars, acc_vars
+
+
 def test_CrossEntropyLoss_masked_inf():
     with make_scope() as session:
         n_out = 13
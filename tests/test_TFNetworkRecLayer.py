@@ -9,6 +9,7 @@ import os
 from nose.tools import assert_equal, assert_not_equal, assert_is_instance
 from numpy.testing.utils import assert_almost_equal, assert_allclose
 import unittest
+from unittest import mock
 import numpy.testing
 from pprint import pprint
 from returnn.util import better_exchook
@@ -5145,6 +5146,231 @@ def test_rec_layer_search_cheating():
         session.run((out.placeholder, out.get_sequence_lengths()), feed_dict=make_feed_dict(extern_data))
 
 
+def test_RecLayer_get_last_hidden_state_cached():
+    from test_TFNetworkLayer import make_feed_dict
+
+    with make_scope() as session:
+        config = Config({"extern_data": {"data": {"dim": 3}}})
+        net = TFNetwork(config=config)
+        net.construct_from_dict({"output": {"class": "rec", "unit": "LSTMBlock", "from": "data", "n_out": 5}})
+        layer = net.get_default_output_layer()
+        h = layer.get_last_hidden_state(key="*")
+        assert h.op.type == "ConcatV2"
+        assert layer.get_last_hidden_state(key="*") is h
+        net.initialize_params(session)
+        assert session.run(h, feed_dict=make_feed_dict(net.extern_data)).shape[-1] == 10
+
+
+def test_GetLastHiddenStateLayer_concat_flat():
+    from test_TFNetworkLayer import make_feed_dict
+
+    with make_scope() as session:
+        config = Config({"extern_data": {"data": {"dim": 3}}})
+        net = TFNetwork(config=config)
+        net.construct_from_dict(
+            {
+                "lstm1": {"class": "rec", "unit": "LSTMBlock", "from": "data", "n_out": 5},
+                "lstm2": {"class": "rec", "unit": "LSTMBlock", "from": "data", "n_out": 5},
+                "output": {"class": "get_last_hidden_state", "from": ["lstm1", "lstm2"], "n_out": 20},
+            }
+        )
+        h = net.get_default_output_layer().output.placeholder
+        assert h.op.type == "ConcatV2"
+        # The (c,h) state tuples of both LSTMs are concatenated with a single concat.
+        assert len(h.op.inputs) == 4 + 1  # + axis
+        parts1 = net.get_layer("lstm1").get_last_hidden_state_parts(key="*")
+        parts2 = net.get_layer("lstm2").get_last_hidden_state_parts(key="*")
+        assert len(parts1) == len(parts2) == 2
+        assert list(h.op.inputs[:-1]) == parts1 + parts2
+        net.initialize_params(session)
+        feed_dict = make_feed_dict(net.extern_data)
+        v, v1, v2 = session.run(
+            (
+                h,
+                net.get_layer("lstm1").get_last_hidden_state(key="*"),
+                net.get_layer("lstm2").get_last_hidden_state(key="*"),
+            ),
+            feed_dict=feed_dict,
+        )
+        numpy.testing.assert_array_equal(v, numpy.concatenate([v1, v2], axis=-1))
+
+
+def test_rec_layer_stacked_backward_reverse_once():
+    from test_TFNetworkLayer import make_feed_dict
+
+    with make_scope() as session:
+        config = Config({"extern_data": {"data": {"dim": 3}}})
+        net = TFNetwork(config=config)
+        net.construct_from_dict(
+            {
+                "lstm1": {"class": "rec", "unit": "standardlstm", "direction": -1, "from": "data", "n_out": 5},
+                "lstm2": {"class": "rec", "unit": "standardlstm", "direction": -1, "from": "lstm1", "n_out": 5},
+                "output": {"class": "copy", "from": "lstm2"},
+            }
+        )
+        # The reversed output of lstm1 is directly reused as the reversed input of lstm2.
+        reverse_ops = [op for op in session.graph.get_operations() if op.type == "ReverseSequence"]
+        assert_equal(len(reverse_ops), 3)
+        net.initialize_params(session)
+        feed_dict = make_feed_dict(net.extern_data)
+        out1 = net.get_layer("lstm1").output
+        seq_len = out1.get_sequence_lengths()
+        y1, y1_rev, y1_rev_ref = session.run(
+            (
+                out1.placeholder,
+                tf_util.reverse_sequence_time_major(out1.placeholder, seq_len),
+                tf.reverse_sequence(out1.placeholder, seq_lengths=seq_len, batch_axis=1, seq_axis=0),
+            ),
+            feed_dict=feed_dict,
+        )
+        numpy.testing.assert_allclose(y1_rev, y1_rev_ref, rtol=1e-6)
+
+
+def test_rec_layer_native_input_projection_xw_plus_b():
+    from test_TFNetworkLayer import make_feed_dict
+
+    for sparse in [False, True]:
+        print("sparse:", sparse)
+        with make_scope() as session:
+            config = Config({"extern_data": {"data": {"dim": 3, "sparse": sparse}}})
+            net = TFNetwork(config=config)
+            net.construct_from_dict({"output": {"class": "rec", "unit": "nativelstm", "from": "data", "n_out": 5}})
+            bias_add_ops = [op for op in session.graph.get_operations() if op.type == "BiasAdd"]
+            assert_equal(len(bias_add_ops), 1)
+            if not sparse:
+                assert_equal(bias_add_ops[0].inputs[0].op.type, "MatMul")
+            net.initialize_params(session)
+            out = net.get_default_output_layer().output
+            v = session.run(out.placeholder, feed_dict=make_feed_dict(net.extern_data))
+            assert_equal(v.shape[-1], 5)
+
+
+def test_rec_subnet_acc_ta_static_size():
+    from test_TFNetworkLayer import make_feed_dict
+
+    with make_scope() as session:
+        config = Config({"extern_data": {"data": {"dim": 3}}})
+        net = TFNetwork(config=config)
+        net.construct_from_dict(
+            {
+                "output": {
+                    "class": "rec",
+                    "from": "data",
+                    "optimize_move_layers_out": False,
+                    "unit": {
+                        "a": {"class": "linear", "from": ["data:source", "prev:a"], "n_out": 5},
+                        "output": {"class": "copy", "from": "a"},
+                    },
+                }
+            }
+        )
+        acc_ta_ops = [
+            op for op in session.graph.get_operations() if op.type == "TensorArrayV3" and "/acc_ta_" in op.name
+        ]
+        assert acc_ta_ops
+        for op in acc_ta_ops:
+            # The seq len is known, thus the size is static.
+            assert not op.get_attr("dynamic_size")
+        net.initialize_params(session)
+        out = net.get_default_output_layer().output
+        v = session.run(out.placeholder, feed_dict=make_feed_dict(net.extern_data))
+        assert_equal(v.shape[-1], 5)
+
+
+def test_rec_subnet_extern_data_no_tensor_array():
+    from test_TFNetworkLayer import make_feed_dict
+
+    with make_scope() as session:
+        config = Config({"extern_data": {"data": {"dim": 3}, "classes": {"dim": 4, "sparse": True}}})
+        net = TFNetwork(config=config, train_flag=True)
+        net.construct_from_dict(
+            {
+                "output": {
+                    "class": "rec",
+                    "from": [],
+                    "target": "classes",
+                    "optimize_move_layers_out": False,
+                    "unit": {
+                        "prev_embed": {"class": "linear", "from": "prev:output", "n_out": 2},
+                        "prob": {"class": "softmax", "from": "prev_embed", "loss": "ce", "target": "classes"},
+                        "output": {
+                            "class": "choice",
+                            "beam_size": 4,
+                            "from": "prob",
+                            "target": "classes",
+                            "initial_output": 0,
+                        },
+                    },
+                }
+            }
+        )
+        ta_names = [op.name for op in session.graph.get_operations() if op.type == "TensorArrayV3"]
+        assert not any("classes" in name for name in ta_names), ta_names
+        net.initialize_params(session)
+        out = net.get_default_output_layer().output
+        feed_dict = make_feed_dict(net.extern_data)
+        v, classes = session.run((out.placeholder, net.extern_data.data["classes"].placeholder), feed_dict=feed_dict)
+        assert_equal(v.tolist(), classes.T.tolist())
+
+
+def test_rec_layer_cudnn_lstm_fallback_without_contrib():
+    from returnn.tf import native_op as tf_native_op
+
+    try:
+        # noinspection PyUnresolvedReferences
+        from tensorflow.contrib import cudnn_rnn  # noqa
+
+        raise unittest.SkipTest("tf.contrib.cudnn_rnn available")
+    except ImportError:
+        pass
+    # Pretend that we have a GPU. CudnnLSTM needs tf.contrib.cudnn_rnn, thus it falls back to another LSTM unit.
+    config = Config({"extern_data": {"data": {"dim": 3}}})
+    with tf.Graph().as_default(), mock.patch.object(tf_util, "is_gpu_available_in_session", return_value=True):
+        net = TFNetwork(config=config)
+        net.construct_from_dict({"output": {"class": "rec", "unit": "CudnnLSTM", "from": "data", "n_out": 5}})
+        layer = net.get_default_output_layer()
+        assert isinstance(layer.cell, tf_native_op.NativeLstm2)
+        assert_equal(layer.output.dim, 5)
+
+
+def test_DotAttentionLayer_masked():
+    from test_TFNetworkLayer import make_feed_dict
+
+    with make_scope() as session:
+        config = Config(
+            {
+                "extern_data": {
+                    "base": {"dim": 4},
+                    "source": {"shape": (4,), "time_dim_axis": None},
+                }
+            }
+        )
+        net = TFNetwork(config=config)
+        net.construct_from_dict(
+            {"output": {"class": "dot_attention", "from": "data:source", "base": "data:base", "base_ctx": "data:base"}}
+        )
+        out = net.get_default_output_layer().output
+        # Energy and weighted sum are done via einsum, no expand_dims + matmul + squeeze.
+        assert not [op for op in session.graph.get_operations() if op.type == "Squeeze"]
+        base = net.extern_data.data["base"]
+        feed_dict = make_feed_dict(net.extern_data)
+        out_v, base_v, seq_lens, source_v = session.run(
+            (
+                out.placeholder,
+                base.placeholder,
+                base.get_sequence_lengths(),
+                net.extern_data.data["source"].placeholder,
+            ),
+            feed_dict=feed_dict,
+        )
+        for b in range(base_v.shape[0]):
+            base_b = base_v[b, : seq_lens[b]]
+            energy = numpy.dot(base_b, source_v[b])
+            weights = numpy.exp(energy - energy.max())
+            weights /= weights.sum()
+            numpy.testing.assert_allclose(out_v[b], numpy.dot(weights, base_b), rtol=1e-5, atol=1e-6)
+
+
 def test_RnnCellLayer_with_time():
     from returnn.datasets.generating import DummyDataset
     from returnn.tf.layers.basic import InternalLayer, SourceLayer, ReduceLayer
@@ -896,6 +896,17 @@ def test_Data_get_common_data_no_broadcast_for_explicit():
         assert out.dim_tags == (batch_dim, time_dim, input_dim, feat_dim)
 
 
+def test_Data_get_axes_from_description_indexed():
+    data = Data(name="indexed_axes_test", shape=(None, 3, None, 5))  # (B,T,3,T',5)
+    with set_behavior_version(0):
+        assert_equal(data.get_axes_from_description("spatial:0"), [1])
+        assert_equal(data.get_axes_from_description("s:-1"), [3])
+        assert_equal(data.get_axes_from_description("dyn:1"), [3])
+        assert_equal(data.get_axes_from_description("except_batch:1"), [2])
+        assert_equal(data.get_axes_from_description("static:0"), [2])
+    assert_equal(data.get_axes_from_description("dim:5"), [4])
+
+
 def test_Data_get_common_data_extra2_static_spatial():
     d1 = Data(name="t", shape=(None, 32, 32, 128), dtype="float32", auto_create_placeholders=True)
     d2 = Data(name="r", shape=(None, 32, 32, 128), dtype="float32", auto_create_placeholders=True)
@@ -1975,6 +1986,27 @@ def test_get_initializer_const_formula():
     assert_almost_equal(session.run(v), numpy.zeros(shape) + numpy.log(1.0 / 4.0))
 
 
+def test_get_initializer_formula_eval_local_ns():
+    shape = (2, 3)
+    for x in [2.0, 3.0]:  # same expression, compiled once, but different local namespace
+        initializer = get_initializer("constant_initializer(x)", eval_local_ns={"x": x})
+        v = initializer(shape)
+        assert_almost_equal(session.run(v), numpy.zeros(shape) + x)
+
+
+def test_copy_dict_structure():
+    out_dim = FeatureDim("output", 13)
+    sub_dict = {"a": {"class": "linear", "from": ["data"], "out_dim": out_dim}}
+    net_dict = {"sub": {"class": "subnetwork", "subnetwork": sub_dict}}
+    net_dict_copy = copy_dict_structure(net_dict)
+    assert_equal(net_dict_copy, net_dict)
+    assert net_dict_copy["sub"]["subnetwork"] is not sub_dict
+    assert net_dict_copy["sub"]["subnetwork"]["a"]["from"] is not sub_dict["a"]["from"]
+    assert net_dict_copy["sub"]["subnetwork"]["a"]["out_dim"] is out_dim
+    net_dict_copy["sub"]["subnetwork"]["b"] = {"class": "copy", "from": "a"}
+    assert "b" not in sub_dict
+
+
 def test_get_initializer_zeros():
     shape = (2, 3)
     initializer = get_initializer("zeros")
@@ -2311,6 +2343,40 @@ def test_scatter_nd():
     session.run(ref_grad)
 
 
+def test_batch_gather():
+    x = numpy.arange(2 * 3 * 4).reshape((2, 3, 4)).astype("float32")
+    indices = numpy.array([2, 0], dtype="int32")
+    y = batch_gather(tf.constant(x), tf.constant(indices))
+    assert_equal(y.get_shape().as_list(), [2, 4])
+    assert_almost_equal(session.run(y), x[numpy.arange(2), indices])
+    y = batch_gather(tf.constant(x[:, :, 0]), tf.constant(indices, dtype=tf.int64), keepdims=True)
+    assert_almost_equal(session.run(y), x[numpy.arange(2), indices][:, :1])
+    indices = numpy.array([[2, 1, 2], [0, 0, 1]], dtype="int32")
+    y = batch_gather(tf.constant(x), tf.constant(indices))
+    assert_almost_equal(session.run(y), x[numpy.arange(2)[:, None], indices])
+
+
+def test_batch_gather_out_of_range():
+    x = numpy.arange(2 * 3).reshape((2, 3)).astype("float32")
+    y = batch_gather(tf.constant(x), tf.constant([1, 3]))
+    try:
+        session.run(y)
+    except tf.errors.InvalidArgumentError as exc:
+        print("Expected exception:", exc.message)
+    else:
+        assert False, "expected InvalidArgumentError"
+
+
+def test_batch_gather_large_shape():
+    # batch * dim > 2 ** 31, which would overflow an int32 flat index.
+    # The last axis is empty, such that this does not need any memory.
+    n = 2**16
+    x = tf.zeros((n, n, 0))
+    y = batch_gather(x, tf.fill([n], n - 1))
+    y_v = session.run(y)
+    assert_equal(y_v.shape, (n, 0))
+
+
 def test_nd_indices_scatter_nd_time_major():
     def rel_embed(x, v, t):
         """
@@ -2943,6 +3009,18 @@ def test_sparse_labels():
     assert_equal(y_eval.dense_shape.tolist(), [2, 4])
 
 
+def test_sparse_labels_collapse_repeated():
+    x = tf.constant([[0, 0, 1, 1, 2], [3, 4, 4, 3, 3], [5, 5, 5, 6, 6]], name="x")
+    seq_lens = tf.constant([5, 4, 3], name="seq_lens")
+    y, y_seq_lens = sparse_labels_with_seq_lens(x, seq_lens=seq_lens, collapse_repeated=True)
+    y_eval, y_seq_lens_eval = session.run((y, y_seq_lens))
+    assert isinstance(y_eval, tf_compat.v1.SparseTensorValue)
+    assert_equal(y_eval.indices.tolist(), [[0, 0], [0, 1], [0, 2], [1, 0], [1, 1], [1, 2], [2, 0]])
+    assert_equal(y_eval.values.tolist(), [0, 1, 2, 3, 4, 3, 5])
+    assert_equal(y_eval.dense_shape.tolist(), [3, 3])
+    assert_equal(y_seq_lens_eval.tolist(), [3, 3, 1])
+
+
 def test_remove_labels():
     x = tf.SparseTensor(
         indices=tf.constant([[0, 0], [0, 1], [0, 2], [1, 0]], dtype=tf.int64, name="x_indices"),
@@ -3159,6 +3237,29 @@ def test_simplify_sub2():
     assert a_b_ is x
 
 
+def test_simplify_non_negative_seq_length_chain():
+    x = tf_compat.v1.placeholder(tf.int32, shape=[3], name="x")
+    a = simplify_non_negative_seq_length(-2 + x)
+    b = simplify_non_negative_seq_length(a - 3)
+    print("Simplified:")
+    print_graph_output(b)
+    assert b.op.type == "Maximum"
+    b_in = [y for y in b.op.inputs if y.op.type != "Const"]
+    assert len(b_in) == 1 and set(b_in[0].op.inputs) & {x}
+    assert_equal(list(b.eval(feed_dict={x: [1, 5, 9]})), [0, 0, 4])
+
+
+def test_fused_moments():
+    rnd = numpy.random.RandomState(42)
+    x_np = rnd.normal(size=(3, 4, 5)).astype("float32")
+    x = tf.constant(x_np)
+    for axis in [0, 1, 2]:
+        reduce_axes = tuple(a for a in range(3) if a != axis)
+        mean, variance = session.run(fused_moments(x, axis=axis))
+        assert_allclose(mean, x_np.mean(axis=reduce_axes), rtol=1e-5, atol=1e-6)
+        assert_allclose(variance, x_np.var(axis=reduce_axes), rtol=1e-5, atol=1e-6)
+
+
 def test_clip_by_value_with_identity_grad():
     err_y = 42.0
     limit = 1.0